@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+# Season aggregate tables and the fact column they are grouped by, next to the season year.
+AGGREGATES = {
+    'agg_driver_season': 'driver_id',
+    'agg_constructor_season': 'constructor_id',
+}
+
+# Additive per-(year, key) sums: partials of any set of races can be
+# combined with a groupby sum, which is what makes the refresh incremental.
+PARTIAL_COLUMNS = ['points', 'wins', 'podiums', 'entries', 'poles', 'positions_gained_sum']
+
+# Largest difference in season points still counted as a match with the standings.
+POINTS_TOLERANCE = 0.01
+
+
+def season_partials(key, race_results, qualifying, race_years):
+    """
+    Sums the results and poles of every (year, key) over the given fact rows.
+
+    Args:
+        key (str): 'driver_id' or 'constructor_id'.
+        race_results (pd.DataFrame): fact_race_results rows (or a chunk of them).
+        qualifying (pd.DataFrame): fact_qualifying rows (or a chunk of them).
+        race_years (pd.Series): Season year indexed by surrogate race_id.
+
+    Returns:
+        pd.DataFrame: PARTIAL_COLUMNS indexed by (year, key).
+    """
+    position = race_results['position'].to_numpy()
+    results = pd.DataFrame({
+        'year': race_years.reindex(race_results['race_id']).to_numpy(),
+        key: race_results[key].to_numpy(),
+        'points': race_results['points'].to_numpy(dtype=np.float64),
+        'wins': (position == 1).astype(np.int64),
+        'podiums': ((position >= 1) & (position <= 3)).astype(np.int64),
+        'entries': np.ones(len(race_results), dtype=np.int64),
+        'positions_gained_sum': race_results['positions_gained'].to_numpy(dtype=np.float64),
+    })
+    partials = results.groupby(['year', key]).sum()
+
+    poles = qualifying[qualifying['position'] == 1]
+    pole_counts = pd.DataFrame({
+        'year': race_years.reindex(poles['race_id']).to_numpy(),
+        key: poles[key].to_numpy(),
+    }).groupby(['year', key]).size().rename('poles')
+
+    partials = partials.join(pole_counts, how='outer')
+    partials = partials.fillna(0)
+    return partials[PARTIAL_COLUMNS]
+
+
+def combine_partials(key, partials):
+    """Adds up partials computed over disjoint sets of fact rows."""
+    partials = [p for p in partials if not p.empty]
+    if not partials:
+        index = pd.MultiIndex.from_arrays([[], []], names=['year', key])
+        return pd.DataFrame(0, index=index, columns=PARTIAL_COLUMNS)
+    return pd.concat(partials).groupby(level=[0, 1]).sum()
+
+
+def finalize(key, partials):
+    """Turns combined partials into the rows of an aggregate table."""
+    df = partials.reset_index()
+    df['year'] = df['year'].astype(int)
+    df[key] = df[key].astype(int)
+    for column in ['wins', 'podiums', 'entries', 'poles']:
+        df[column] = df[column].astype(int)
+    df['avg_positions_gained'] = df['positions_gained_sum'] / df['entries'].where(df['entries'] > 0)
+    df['avg_positions_gained'] = df['avg_positions_gained'].fillna(0.0)
+    return df[['year', key, 'points', 'wins', 'podiums', 'entries', 'poles', 'avg_positions_gained']]
+
+
+def race_years(dim_races):
+    """Returns the season year of every surrogate race_id."""
+    return pd.Series(dim_races['year'].to_numpy(), index=dim_races['race_id'].to_numpy())
+
+
+def build_aggregates(race_results, qualifying, dim_races):
+    """
+    Builds every table of AGGREGATES from in-memory fact frames.
+
+    Returns:
+        dict: Aggregate frame per table name.
+    """
+    years = race_years(dim_races)
+    return {
+        name: finalize(key, season_partials(key, race_results, qualifying, years))
+        for name, key in AGGREGATES.items()
+    }
+
+
+def build_aggregates_from_processed(store, dim_races, years=None, chunksize=100_000):
+    """
+    Builds every table of AGGREGATES from the processed fact tables, chunk by
+    chunk, so the fact tables never have to be in memory at once.
+
+    Args:
+        store (ProcessedStore): Output holding fact_race_results and fact_qualifying.
+        dim_races (pd.DataFrame): The races dimension.
+        years (iterable, optional): Only aggregate these seasons; only their
+            partitions are read from Parquet output.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        dict: Aggregate frame per table name.
+    """
+    season_of = race_years(dim_races)
+    if years is not None:
+        years = list(years)
+        season_of = season_of[season_of.isin(years)]
+
+    def chunks(name, columns):
+        for chunk in store.iter_chunks(name, columns, years=years, chunksize=chunksize):
+            yield chunk[chunk['race_id'].isin(season_of.index)]
+
+    partials = {name: [] for name in AGGREGATES}
+    result_columns = ['race_id', 'driver_id', 'constructor_id', 'position', 'points', 'positions_gained']
+    qualifying_columns = ['race_id', 'driver_id', 'constructor_id', 'position']
+    no_qualifying = pd.DataFrame(columns=qualifying_columns)
+    no_results = pd.DataFrame(columns=result_columns)
+    for chunk in chunks('fact_race_results', result_columns):
+        for name, key in AGGREGATES.items():
+            partials[name].append(season_partials(key, chunk, no_qualifying, season_of))
+    for chunk in chunks('fact_qualifying', qualifying_columns):
+        for name, key in AGGREGATES.items():
+            partials[name].append(season_partials(key, no_results, chunk, season_of))
+    return {name: finalize(key, combine_partials(key, partials[name])) for name, key in AGGREGATES.items()}
+
+
+def check_standings(aggregate, standings, key):
+    """
+    Compares season points and wins of an aggregate table with the final
+    championship standings.
+
+    Mismatches are expected for some seasons: standings include sprint
+    points (not in results.csv), before 1991 only the best results of each
+    driver counted, and until 1978 only the best-placed car of a constructor
+    scored constructor points.
+
+    Returns:
+        pd.DataFrame: Per season, the compared rows and the rows whose points
+        or wins differ.
+    """
+    merged = aggregate[['year', key, 'points', 'wins']].merge(
+        standings, on=['year', key], how='outer', suffixes=('', '_standings'),
+    )
+    merged = merged[merged['year'].isin(standings['year'].unique())]
+    points_diff = (merged['points'].fillna(0) - merged['points_standings'].fillna(0)).abs()
+    merged['points_mismatch'] = points_diff > POINTS_TOLERANCE
+    merged['wins_mismatch'] = merged['wins'].fillna(0) != merged['wins_standings'].fillna(0)
+    return merged.groupby('year').agg(
+        compared=(key, 'size'),
+        points_mismatches=('points_mismatch', 'sum'),
+        wins_mismatches=('wins_mismatch', 'sum'),
+    ).reset_index()
+
+
+def report_standings_check(name, check):
+    """Prints how many seasons of an aggregate table match the standings."""
+    mismatched = check[(check['points_mismatches'] > 0) | (check['wins_mismatches'] > 0)]
+    print(f"\n{name}: {len(check) - len(mismatched)} of {len(check)} season(s) match the standings.")
+    if not mismatched.empty:
+        print(mismatched.to_string(index=False))
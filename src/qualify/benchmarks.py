@@ -0,0 +1,437 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from schemas import RAW_SCHEMAS
+from timeparse import to_milliseconds
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+RAW_DATA_DIRECTORY = os.path.join(DATA_DIRECTORY, 'raw')
+SYNTHETIC_DATA_DIRECTORY = os.path.join(DATA_DIRECTORY, 'benchmark')
+BASELINE_PATH = os.path.join(SYNTHETIC_DATA_DIRECTORY, 'baseline.json')
+
+# Raw fact files that are replicated per synthetic race, with their own id columns.
+SCALED_FACTS = {'results': ['resultId'], 'qualifying': ['qualifyId'], 'pit_stops': []}
+# Raw dimension files copied unchanged: every synthetic race reuses the real
+# drivers, constructors, circuits and statuses.
+COPIED_DIMENSIONS = ['drivers', 'constructors', 'circuits', 'status']
+
+
+def _legacy_time_to_milliseconds(time_str):
+    """Row-wise reference parser ('M:SS.ms' only) used before timeparse existed."""
+    if pd.isna(time_str) or time_str == '\\N':
+        return None
+    try:
+        minutes, seconds = time_str.split(':')
+        total_seconds = int(minutes) * 60 + float(seconds)
+        return int(total_seconds * 1000)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _time_it(func, repeat=3):
+    """Returns the best wall-clock time in seconds over 'repeat' runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _synthetic_time_strings(kind, n, seed=0):
+    """Builds 'n' random time strings of the given format."""
+    rng = np.random.default_rng(seed)
+    ms = rng.integers(0, 1000, n).astype(str)
+    ms = pd.Series(ms).str.zfill(3)
+    seconds = pd.Series(rng.integers(0, 60, n).astype(str)).str.zfill(2)
+    if kind == 'lap':
+        minutes = pd.Series(rng.integers(1, 3, n).astype(str))
+        return minutes + ':' + seconds + '.' + ms
+    if kind == 'race':
+        hours = pd.Series(rng.integers(1, 3, n).astype(str))
+        minutes = pd.Series(rng.integers(0, 60, n).astype(str)).str.zfill(2)
+        return hours + ':' + minutes + ':' + seconds + '.' + ms
+    if kind == 'gap':
+        return '+' + pd.Series(rng.integers(0, 90, n).astype(str)) + '.' + ms
+    if kind == 'null':
+        return pd.Series(['\\N'] * n, dtype=object)
+    raise ValueError(f"Unknown time format '{kind}'.")
+
+
+def bench_time_parsing(n=200_000, repeat=3):
+    """
+    Measures the throughput of timeparse.to_milliseconds for every
+    supported format, and of the legacy row-wise parser where it applies.
+
+    Returns:
+        pd.DataFrame: One row per (format, parser) with rows per second.
+    """
+    rows = []
+    for kind in ['lap', 'race', 'gap', 'null']:
+        values = _synthetic_time_strings(kind, n)
+        elapsed = _time_it(lambda: to_milliseconds(values), repeat)
+        rows.append({'format': kind, 'parser': 'vectorized', 'seconds': elapsed, 'rows_per_sec': n / elapsed})
+        if kind in ('lap', 'null'):
+            elapsed = _time_it(lambda: values.apply(_legacy_time_to_milliseconds), repeat)
+            rows.append({'format': kind, 'parser': 'legacy_apply', 'seconds': elapsed, 'rows_per_sec': n / elapsed})
+    return pd.DataFrame(rows)
+
+
+def _processed_tables(data_path=RAW_DATA_DIRECTORY):
+    """Runs every process_* step once and returns the frames keyed by table name."""
+    from et import F1ETQualifyProcessor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = F1ETQualifyProcessor(data_path=data_path)
+        return {
+            'dim_drivers': processor.process_dim_drivers(),
+            'dim_constructors': processor.process_dim_constructors(),
+            'dim_circuits': processor.process_dim_circuits(),
+            'dim_races': processor.process_dim_races(),
+            'dim_status': processor.process_dim_status(),
+            'fact_qualifying': processor.process_fact_qualifying(),
+            'fact_pit_stops': processor.process_fact_pit_stops(),
+            'fact_race_results': processor.process_fact_race_results(),
+        }
+
+
+def bench_bulk_load(database_uri=None, strategies=None, use_staging=True, tables=None):
+    """
+    Times DatabaseLoader.load_data once per bulk-load strategy.
+
+    Without 'database_uri' every strategy loads a fresh temporary SQLite file,
+    as a stand-in for MySQL; 'load_data_infile' is then skipped (and
+    'sqlite_bulk' is skipped on MySQL).
+
+    Returns:
+        pd.DataFrame: One row per strategy with seconds and rows per second.
+    """
+    from sqlalchemy import create_engine
+
+    from bulkload import STRATEGIES
+    from loader import DatabaseLoader
+
+    tables = tables or _processed_tables()
+    total_rows = sum(len(df) for df in tables.values())
+    rows = []
+    for name in strategies or list(STRATEGIES):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            uri = database_uri or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+            engine = create_engine(uri)
+            if (name, engine.dialect.name) in (('load_data_infile', 'sqlite'), ('sqlite_bulk', 'mysql')):
+                engine.dispose()
+                continue
+            loader = DatabaseLoader(engine, strategy=STRATEGIES[name](), use_staging=use_staging)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader.load_data(**tables)
+            elapsed = time.perf_counter() - start
+            engine.dispose()
+        rows.append({'strategy': name, 'seconds': elapsed, 'rows_per_sec': total_rows / elapsed})
+    return pd.DataFrame(rows)
+
+
+# Typical star-schema reads of the dashboards, keyed by a short name.
+STAR_QUERIES = {
+    'season_driver_points': (
+        "SELECT r.driver_id, SUM(r.points) FROM fact_race_results r "
+        "JOIN dim_races d ON d.race_id = r.race_id WHERE d.year = 2009 GROUP BY r.driver_id"
+    ),
+    'driver_career': (
+        "SELECT d.year, d.round, r.position, r.points FROM fact_race_results r "
+        "JOIN dim_races d ON d.race_id = r.race_id WHERE r.driver_id = 1 ORDER BY r.race_id"
+    ),
+    'race_grid_vs_qualifying': (
+        "SELECT r.driver_id, q.position, r.grid, r.position FROM fact_race_results r "
+        "JOIN fact_qualifying q ON q.race_id = r.race_id AND q.driver_id = r.driver_id "
+        "WHERE r.race_id = 18"
+    ),
+    'race_pit_stops': "SELECT driver_id, COUNT(*), SUM(duration_ms) FROM fact_pit_stops WHERE race_id = 900 GROUP BY driver_id",
+    'constructor_history': (
+        "SELECT d.year, SUM(r.points) FROM fact_race_results r "
+        "JOIN dim_races d ON d.race_id = r.race_id WHERE r.constructor_id = 6 GROUP BY d.year"
+    ),
+    'season_calendar': "SELECT race_id, round, name FROM dim_races WHERE year = 2009 ORDER BY round",
+}
+
+
+def bench_queries(scale=10, repeat=20, queries=None):
+    """
+    Measures the latency of typical star-schema queries on SQLite before and
+    after models.create_indexes(), over synthetic data of the given scale.
+
+    Returns:
+        pd.DataFrame: One row per query with the best latency in milliseconds
+        with and without the secondary indexes.
+    """
+    from sqlalchemy import create_engine, text
+
+    from loader import DatabaseLoader
+    from models import create_indexes, drop_indexes
+
+    queries = queries or STAR_QUERIES
+    tables = _processed_tables(generate_synthetic_raw(scale) if scale > 1 else RAW_DATA_DIRECTORY)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            DatabaseLoader(engine, use_staging=False).load_data(**tables)
+            drop_indexes(engine)
+
+        def latencies():
+            with engine.connect() as connection:
+                timings = {}
+                for name, sql in queries.items():
+                    statement = text(sql)
+                    timings[name] = _time_it(lambda: connection.execute(statement).fetchall(), repeat)
+                return timings
+
+        before = latencies()
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_indexes(engine)
+        after = latencies()
+        engine.dispose()
+
+    for name in queries:
+        rows.append({
+            'query': name,
+            'no_index_ms': before[name] * 1000,
+            'indexed_ms': after[name] * 1000,
+            'speedup': before[name] / after[name],
+        })
+    return pd.DataFrame(rows)
+
+
+def _id_offset(max_id):
+    """Smallest power of ten above 'max_id', so copies keep the original ids as suffix."""
+    return 10 ** len(str(int(max_id)))
+
+
+def generate_synthetic_raw(scale, target_dir=None, source_dir=RAW_DATA_DIRECTORY):
+    """
+    Writes Ergast-shaped raw CSVs with 'scale' times the races of 'source_dir'.
+
+    Copy k of a race gets raceId + k * offset, and so do the ids of its
+    results, qualifying rows and pit stops; the dimension files are copied
+    unchanged, so every foreign key still resolves. A finished directory is
+    reused by later calls.
+
+    Args:
+        scale (int): Number of copies of every race.
+        target_dir (str, optional): Output directory; defaults to
+            data/benchmark/scale_<scale>.
+        source_dir (str): Directory with the real raw files.
+
+    Returns:
+        str: The directory holding the synthetic files.
+    """
+    target_dir = target_dir or os.path.join(SYNTHETIC_DATA_DIRECTORY, f'scale_{scale}')
+    marker = os.path.join(target_dir, '.complete')
+    if os.path.exists(marker):
+        return target_dir
+    os.makedirs(target_dir, exist_ok=True)
+
+    for name in COPIED_DIMENSIONS:
+        file_name = RAW_SCHEMAS[name]['file']
+        shutil.copyfile(os.path.join(source_dir, file_name), os.path.join(target_dir, file_name))
+
+    # races.csv is ragged, so it is rewritten line by line rather than re-serialised.
+    races_file = RAW_SCHEMAS['races']['file']
+    with open(os.path.join(source_dir, races_file), newline='') as f:
+        header, *race_lines = f.readlines()
+    race_offset = _id_offset(max(int(line.split(',', 1)[0]) for line in race_lines))
+    with open(os.path.join(target_dir, races_file), 'w', newline='') as out:
+        out.write(header)
+        for k in range(scale):
+            for line in race_lines:
+                race_id, rest = line.split(',', 1)
+                out.write(f"{int(race_id) + k * race_offset},{rest}")
+
+    for name, id_columns in SCALED_FACTS.items():
+        file_name = RAW_SCHEMAS[name]['file']
+        # Read everything as text so '\N' markers and number formats round-trip unchanged.
+        df = pd.read_csv(os.path.join(source_dir, file_name), dtype=str, keep_default_na=False)
+        base_ids = {c: df[c].astype(np.int64) for c in ['raceId'] + id_columns}
+        offsets = {c: race_offset if c == 'raceId' else _id_offset(ids.max()) for c, ids in base_ids.items()}
+        path = os.path.join(target_dir, file_name)
+        for k in range(scale):
+            for column, ids in base_ids.items():
+                df[column] = (ids + k * offsets[column]).astype(str)
+            df.to_csv(path, mode='w' if k == 0 else 'a', header=k == 0, index=False, lineterminator='\n')
+
+    open(marker, 'w').close()
+    return target_dir
+
+
+def _peak_rss_mb():
+    """Returns the peak resident set size of this process in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _profile_pipeline(data_path, database_uri, strategy_name):
+    """
+    Runs every process_* step and every load step once over 'data_path',
+    in the current process.
+
+    Returns:
+        list: One dict per step with seconds, output rows and the peak RSS
+        of the process once the step has finished.
+    """
+    from sqlalchemy import create_engine
+
+    from bulkload import STRATEGIES
+    from et import F1ETQualifyProcessor
+    from loader import DatabaseLoader
+
+    steps = []
+
+    def timed(step, func):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        elapsed = time.perf_counter() - start
+        steps.append({
+            'step': step,
+            'seconds': elapsed,
+            'rows': len(result) if result is not None else None,
+            'peak_rss_mb': _peak_rss_mb(),
+        })
+        return result
+
+    processor = F1ETQualifyProcessor(data_path=data_path)
+    tables = {}
+    for name in DatabaseLoader.DIMENSIONS + DatabaseLoader.FACTS:
+        tables[name] = timed(f'process_{name}', getattr(processor, f'process_{name}'))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(database_uri or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        loader = DatabaseLoader(engine, strategy=STRATEGIES[strategy_name](), use_staging=True)
+        timed('begin_load', loader.begin_load)
+        for name, df in tables.items():
+            timed(f'load_{name}', lambda: (loader.load_table(name, df), df)[1])
+        timed('finish_load', loader.finish_load)
+        engine.dispose()
+    return steps
+
+
+def bench_scaling(scales=(10, 100, 1000), database_uri=None, strategy='executemany'):
+    """
+    Times each process_* and load step over synthetic data of every scale.
+
+    Every scale runs in a fresh process, so the peak RSS of one scale is not
+    inherited by the next.
+
+    Args:
+        scales (iterable): Multipliers of the bundled raw data.
+        database_uri (str, optional): Load target; a temporary SQLite file
+            per scale when omitted.
+        strategy (str): Name of the bulk-load strategy in bulkload.STRATEGIES.
+
+    Returns:
+        pd.DataFrame: One row per (scale, step).
+    """
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for scale in scales:
+        data_path = generate_synthetic_raw(scale)
+        with context.Pool(1) as pool:
+            steps = pool.apply(_profile_pipeline, (data_path, database_uri, strategy))
+        rows.extend({'scale': scale, **step} for step in steps)
+    return pd.DataFrame(rows)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Stores benchmark results as the baseline later runs are compared to."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results.to_dict(orient='records'), f, indent=2)
+
+
+def flag_regressions(results, path=BASELINE_PATH, tolerance=0.25, min_seconds=0.05):
+    """
+    Compares benchmark results with the stored baseline.
+
+    A step regresses when it is more than 'tolerance' slower (and at least
+    'min_seconds' slower, to ignore timer noise on tiny steps) or its peak
+    RSS grew by more than 'tolerance'.
+
+    Returns:
+        pd.DataFrame: The results with baseline columns and a 'regression'
+        flag; without a baseline the flag is False everywhere.
+    """
+    results = results.copy()
+    results['regression'] = False
+    if not os.path.exists(path):
+        print(f"No benchmark baseline at '{path}'; run with --save-baseline to create one.")
+        return results
+    with open(path) as f:
+        baseline = pd.DataFrame(json.load(f))
+    baseline = baseline[['scale', 'step', 'seconds', 'peak_rss_mb']]
+    results = results.merge(baseline, on=['scale', 'step'], how='left', suffixes=('', '_baseline'))
+    slower = (
+        (results['seconds'] > results['seconds_baseline'] * (1 + tolerance))
+        & (results['seconds'] - results['seconds_baseline'] > min_seconds)
+    )
+    bigger = results['peak_rss_mb'] > results['peak_rss_mb_baseline'] * (1 + tolerance)
+    results['regression'] = (slower | bigger).fillna(False).astype(bool)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="F1 ETL benchmarks.")
+    parser.add_argument('--scales', type=int, nargs='*',
+                        help="Run the synthetic-scale suite for these multipliers (e.g. 10 100 1000).")
+    parser.add_argument('--strategy', default='executemany', help="Bulk-load strategy of the scale suite.")
+    parser.add_argument('--database-uri', help="Load target of the scale suite (temporary SQLite by default).")
+    parser.add_argument('--save-baseline', action='store_true', help="Store the scale results as the new baseline.")
+    parser.add_argument('--queries', type=int, metavar='SCALE',
+                        help="Benchmark star-schema queries on SQLite, with and without indexes, at this scale.")
+    args = parser.parse_args()
+
+    if args.queries is not None:
+        print(f"\n** Star-Schema Queries (SQLite, scale {args.queries}) **")
+        print(bench_queries(args.queries).to_string(index=False))
+        sys.exit(0)
+
+    if args.scales is None:
+        print("\n** Time Parsing Throughput **")
+        print(bench_time_parsing().to_string(index=False))
+        print("\n** Bulk Load Strategies (SQLite stand-in) **")
+        print(bench_bulk_load().to_string(index=False))
+        sys.exit(0)
+
+    results = bench_scaling(args.scales or (10, 100, 1000), args.database_uri, args.strategy)
+    compared = flag_regressions(results)
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"Baseline saved to '{BASELINE_PATH}'.")
+    results = compared
+    print("\n** Synthetic Scale Benchmark **")
+    print(results.to_string(index=False))
+    regressions = results[results['regression']]
+    if not regressions.empty:
+        print(f"\nWARNING: {len(regressions)} step(s) regressed against the baseline:")
+        print(regressions[['scale', 'step', 'seconds', 'seconds_baseline', 'peak_rss_mb', 'peak_rss_mb_baseline']].to_string(index=False))
+        sys.exit(1)
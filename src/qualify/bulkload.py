@@ -0,0 +1,250 @@
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import Column, Date, ForeignKey, MetaData, Table, text
+
+STAGING_SUFFIX = '_staging'
+OLD_SUFFIX = '_old'
+
+# Upper bound of bound parameters per statement, per dialect.
+MAX_PARAMS = {'sqlite': 32766, 'mysql': 65535}
+
+
+def python_values(table, df):
+    """
+    Returns a copy of 'df' holding plain Python values the DB drivers can bind:
+    NaN becomes None and the table's Date columns hold datetime.date objects.
+    """
+    df = df.copy()
+    for column in table.columns:
+        if isinstance(column.type, Date) and column.name in df.columns:
+            df[column.name] = pd.to_datetime(df[column.name], errors='coerce').dt.date
+    return df.astype(object).where(df.notna(), None)
+
+
+class ToSqlStrategy:
+    """Plain DataFrame.to_sql with one bound statement per row (the pandas default)."""
+    name = 'to_sql'
+
+    def __init__(self, chunksize=10000):
+        self.chunksize = chunksize
+
+    def load(self, connection, table, df, csv_path=None):
+        df.to_sql(table.name, con=connection, if_exists='append', index=False, chunksize=self.chunksize)
+
+
+# DB-API placeholder for each paramstyle the raw-cursor strategies support.
+PLACEHOLDERS = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+
+
+def _insert_sql(connection, table, columns, rows_per_statement=1):
+    """Builds 'INSERT INTO t (cols) VALUES (...), (...)' with DB-API placeholders."""
+    paramstyle = connection.dialect.paramstyle
+    if paramstyle not in PLACEHOLDERS:
+        raise NotImplementedError(f"Raw-cursor loading does not support the '{paramstyle}' paramstyle.")
+    preparer = connection.dialect.identifier_preparer
+    column_list = ', '.join(preparer.quote(c) for c in columns)
+    row = '(' + ', '.join([PLACEHOLDERS[paramstyle]] * len(columns)) + ')'
+    return f"INSERT INTO {preparer.quote(table.name)} ({column_list}) VALUES " + ', '.join([row] * rows_per_statement)
+
+
+class MultiRowInsertStrategy:
+    """
+    Batches many rows into a single 'INSERT ... VALUES (...), (...), ...'
+    statement, capped by the dialect's limit on bound parameters.
+    """
+    name = 'multi_row_insert'
+
+    def __init__(self, rows_per_statement=1000):
+        self.rows_per_statement = rows_per_statement
+
+    def load(self, connection, table, df, csv_path=None):
+        if df.empty:
+            return
+        max_params = MAX_PARAMS.get(connection.dialect.name, 2000)
+        per_statement = max(1, min(self.rows_per_statement, max_params // len(df.columns)))
+        values = python_values(table, df).to_numpy()
+        full_sql = _insert_sql(connection, table, df.columns, per_statement)
+
+        cursor = connection.connection.cursor()
+        try:
+            for start in range(0, len(values), per_statement):
+                batch = values[start:start + per_statement]
+                sql = full_sql if len(batch) == per_statement else _insert_sql(connection, table, df.columns, len(batch))
+                cursor.execute(sql, batch.ravel().tolist())
+        finally:
+            cursor.close()
+
+
+class ExecuteManyStrategy:
+    """
+    Sends rows as tuples through the DB-API executemany() in batches of
+    'batch_size'. PyMySQL rewrites these into multi-row INSERTs itself.
+    """
+    name = 'executemany'
+
+    def __init__(self, batch_size=20000):
+        self.batch_size = batch_size
+
+    def load(self, connection, table, df, csv_path=None):
+        if df.empty:
+            return
+        sql = _insert_sql(connection, table, df.columns)
+        rows = python_values(table, df).to_numpy().tolist()
+        cursor = connection.connection.cursor()
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                cursor.executemany(sql, rows[start:start + self.batch_size])
+        finally:
+            cursor.close()
+
+
+def _column_values(table, df):
+    """
+    Returns one list of bindable Python values per column of 'df'. Columns
+    without nulls convert in a single tolist(); only the others pay for the
+    per-value NaN to None replacement.
+    """
+    date_columns = {c.name for c in table.columns if isinstance(c.type, Date)}
+    columns = []
+    for name in df.columns:
+        values = df[name]
+        if name in date_columns:
+            values = pd.to_datetime(values, errors='coerce').dt.date
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        if values.hasnans:
+            columns.append(values.astype(object).where(values.notna(), None).tolist())
+        else:
+            columns.append(values.tolist())
+    return columns
+
+
+class SqliteBulkStrategy:
+    """
+    SQLite only: hands the whole frame to sqlite3's executemany() as one row
+    iterator, so a single prepared statement is bound and stepped in C for
+    every row. Rows are zipped from per-column lists on the fly instead of
+    being materialized as tuples first, and the load's one transaction
+    writes the pages once at commit.
+    """
+    name = 'sqlite_bulk'
+
+    def load(self, connection, table, df, csv_path=None):
+        if connection.dialect.name != 'sqlite':
+            raise NotImplementedError("The 'sqlite_bulk' strategy is only available on SQLite.")
+        if df.empty:
+            return
+        sql = _insert_sql(connection, table, df.columns)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.executemany(sql, zip(*_column_values(table, df)))
+        finally:
+            cursor.close()
+
+
+class LoadDataInfileStrategy:
+    """
+    MySQL only: streams a CSV file with 'LOAD DATA LOCAL INFILE'. Uses the
+    processed CSV of the table when one is given, otherwise writes the frame
+    to a temporary file first. The engine must be created with
+    connect_args={'local_infile': True}.
+    """
+    name = 'load_data_infile'
+
+    def load(self, connection, table, df, csv_path=None):
+        if connection.dialect.name != 'mysql':
+            raise NotImplementedError("LOAD DATA LOCAL INFILE is only available on MySQL.")
+        if csv_path is not None and os.path.exists(csv_path):
+            self._load_file(connection, table, csv_path)
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        try:
+            df.to_csv(tmp_path, index=False, lineterminator='\n')
+            self._load_file(connection, table, tmp_path)
+        finally:
+            os.remove(tmp_path)
+
+    def _load_file(self, connection, table, path):
+        with open(path, 'rb') as f:
+            header = f.readline()
+        line_end = '\\r\\n' if header.endswith(b'\r\n') else '\\n'
+        columns = header.decode().strip().split(',')
+        # Every field goes through a user variable so empty strings load as NULL.
+        variables = ', '.join(f'@v{i}' for i in range(len(columns)))
+        assignments = ', '.join(f'`{c}` = NULLIF(@v{i}, \'\')' for i, c in enumerate(columns))
+        path = os.path.abspath(path).replace('\\', '/')
+        connection.execute(text(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{table.name}` "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '{line_end}' IGNORE 1 LINES "
+            f"({variables}) SET {assignments}"
+        ))
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (ToSqlStrategy, MultiRowInsertStrategy, ExecuteManyStrategy, SqliteBulkStrategy, LoadDataInfileStrategy)
+}
+
+
+def staging_tables(metadata, suffix=STAGING_SUFFIX):
+    """
+    Copies every table of 'metadata' into a new MetaData under '<name><suffix>',
+    with foreign keys pointing at the copied tables.
+
+    Returns:
+        MetaData: The staging schema.
+    """
+    staging = MetaData()
+    for table in metadata.sorted_tables:
+        columns = []
+        for column in table.columns:
+            foreign_keys = [
+                ForeignKey(f"{fk.column.table.name}{suffix}.{fk.column.name}")
+                for fk in column.foreign_keys
+            ]
+            columns.append(Column(column.name, column.type, *foreign_keys, primary_key=column.primary_key))
+        Table(f"{table.name}{suffix}", staging, *columns)
+    return staging
+
+
+def swap_in_staging(engine, metadata, suffix=STAGING_SUFFIX):
+    """
+    Replaces every live table of 'metadata' with its staging copy.
+
+    On MySQL this is a single RENAME TABLE statement, which is atomic. On
+    other dialects the drops and renames run in one transaction, which is
+    atomic wherever DDL is transactional (SQLite, PostgreSQL).
+    """
+    from sqlalchemy import inspect
+
+    existing = set(inspect(engine).get_table_names())
+    names = [table.name for table in metadata.sorted_tables]
+    preparer = engine.dialect.identifier_preparer
+
+    if engine.dialect.name == 'mysql':
+        renames = []
+        for name in names:
+            if name in existing:
+                renames.append(f"{preparer.quote(name)} TO {preparer.quote(name + OLD_SUFFIX)}")
+            renames.append(f"{preparer.quote(name + suffix)} TO {preparer.quote(name)}")
+        with engine.begin() as connection:
+            # Leftovers of an interrupted swap would make the rename fail.
+            for name in reversed(names):
+                connection.execute(text(f"DROP TABLE IF EXISTS {preparer.quote(name + OLD_SUFFIX)}"))
+            connection.execute(text("RENAME TABLE " + ', '.join(renames)))
+            # Children first, so no foreign key blocks a drop.
+            for name in reversed(names):
+                if name in existing:
+                    connection.execute(text(f"DROP TABLE {preparer.quote(name + OLD_SUFFIX)}"))
+        return
+
+    with engine.begin() as connection:
+        for name in reversed(names):
+            if name in existing:
+                connection.execute(text(f"DROP TABLE {preparer.quote(name)}"))
+        for name in names:
+            connection.execute(text(f"ALTER TABLE {preparer.quote(name + suffix)} RENAME TO {preparer.quote(name)}"))
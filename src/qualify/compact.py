@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+# Object columns whose distinct values are at most this share of the rows
+# become categoricals.
+CATEGORY_MAX_RATIO = 0.5
+
+# Smallest integer dtypes tried when downcasting, in order.
+INT_CANDIDATES = ['int8', 'int16', 'int32', 'int64']
+
+
+def _smallest_int(values):
+    """Returns the smallest signed integer dtype name that holds every value of 'values'."""
+    if not len(values):
+        return None
+    low, high = values.min(), values.max()
+    for candidate in INT_CANDIDATES:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+    return None
+
+
+def compact_dtypes(df):
+    """
+    Returns 'df' with compact dtypes: integers downcast to the smallest
+    type that holds them (nullable Int columns stay nullable) and repeated
+    strings as categoricals. Floats are left alone, since narrowing them
+    would change their CSV text. Values are unchanged, so the CSV output and
+    the loaded rows stay the same.
+    """
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_bool_dtype(values) or isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            nullable = pd.api.types.is_extension_array_dtype(values)
+            target = _smallest_int(values.dropna().to_numpy(dtype=np.int64) if nullable else values.to_numpy())
+            if target is not None:
+                df[column] = values.astype(target.capitalize() if nullable else target)
+        elif values.dtype == object and len(values):
+            if values.nunique(dropna=False) <= CATEGORY_MAX_RATIO * len(values):
+                df[column] = values.astype('category')
+    return df
+
+
+def frame_memory(df):
+    """Returns the memory of 'df' in bytes, including the Python strings of object columns."""
+    return int(df.memory_usage(deep=True, index=True).sum())
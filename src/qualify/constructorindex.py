@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+def pack_keys(race_ids, driver_ids):
+    """Packs (raceId, driverId) pairs into one int64 each: raceId in the high 32 bits, driverId in the low 32."""
+    races = np.asarray(race_ids, dtype=np.int64)
+    drivers = np.asarray(driver_ids, dtype=np.int64)
+    return (races << 32) | (drivers & 0xFFFFFFFF)
+
+
+class ConstructorIndex:
+    """
+    The constructor every driver entered each race for, from the raw
+    results: a sorted array of packed (raceId, driverId) keys next to the
+    constructorId of each. A lookup packs the probed pairs the same way and
+    finds them with one np.searchsorted, so no frame is merged.
+
+    Drivers who shared cars of different teams in one race have several
+    constructors there. Such keys are ambiguous: the first constructor in
+    file order is used, and every one of them is listed in 'ambiguous'.
+    """
+    def __init__(self, keys, constructors, ambiguous):
+        """
+        Args:
+            keys (np.ndarray): Sorted, unique packed keys.
+            constructors (np.ndarray): constructorId of every key.
+            ambiguous (pd.DataFrame): (raceId, driverId, constructorId) rows of
+                the keys with more than one constructor.
+        """
+        self.keys = keys
+        self.constructors = constructors
+        self.ambiguous = ambiguous
+
+    @classmethod
+    def from_results(cls, chunks):
+        """
+        Builds the index from raw results rows.
+
+        Args:
+            chunks (iterable): Frames with raceId, driverId and constructorId
+                columns: the whole results file or its chunks, in file order.
+
+        Returns:
+            ConstructorIndex: The index.
+        """
+        keys, constructors = [], []
+        for chunk in chunks:
+            keys.append(pack_keys(chunk['raceId'], chunk['driverId']))
+            constructors.append(chunk['constructorId'].to_numpy(dtype=np.int64))
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        constructors = np.concatenate(constructors) if constructors else np.empty(0, dtype=np.int64)
+
+        # A stable sort keeps the rows of every key in file order.
+        order = np.argsort(keys, kind='stable')
+        keys, constructors = keys[order], constructors[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        group = np.cumsum(first) - 1
+        unique_keys, chosen = keys[first], constructors[first]
+
+        conflicting = np.unique(group[constructors != chosen[group]])
+        rows = np.isin(group, conflicting)
+        ambiguous = pd.DataFrame({
+            'raceId': keys[rows] >> 32,
+            'driverId': keys[rows] & 0xFFFFFFFF,
+            'constructorId': constructors[rows],
+        }).drop_duplicates(ignore_index=True)
+        return cls(unique_keys, chosen, ambiguous)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, race_ids, driver_ids):
+        """
+        Returns the constructorId of every (raceId, driverId) pair.
+
+        Args:
+            race_ids (pd.Series): Natural raceIds.
+            driver_ids (pd.Series): Natural driverIds, aligned with 'race_ids'.
+
+        Returns:
+            pd.Series: Nullable 'Int64' constructorIds named 'constructorId',
+            with the index of 'race_ids'; <NA> for pairs without a result.
+        """
+        probe = pack_keys(race_ids, driver_ids)
+        found = np.zeros(len(probe), dtype=bool)
+        values = np.zeros(len(probe), dtype=np.int64)
+        if len(self.keys):
+            positions = np.minimum(np.searchsorted(self.keys, probe), len(self.keys) - 1)
+            found = self.keys[positions] == probe
+            values = np.where(found, self.constructors[positions], 0)
+        return pd.Series(pd.arrays.IntegerArray(values, ~found), index=race_ids.index, name='constructorId')
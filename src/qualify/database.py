@@ -1,16 +1,70 @@
-from sqlalchemy import create_engine
-
-# Database configuration
-DB_USER = "root"
-DB_PASSWORD = "admin" 
-DB_HOST = "localhost"
-DB_PORT = "3306"
-DB_NAME = "f1_db"  
-
-DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-try:
-    engine = create_engine(DATABASE_URI)
-    print("Database engine created successfully.")
-except Exception as e:
-    print(f"Failed to create database engine: {e}")
\ No newline at end of file
+import os
+
+# Storage backend of the warehouse, one of BACKENDS. The F1_DB_BACKEND
+# environment variable overrides it.
+DB_BACKEND = os.environ.get('F1_DB_BACKEND', 'mysql')
+
+# MySQL configuration (each value can be overridden with an F1_DB_* environment variable)
+DB_USER = os.environ.get('F1_DB_USER', "root")
+DB_PASSWORD = os.environ.get('F1_DB_PASSWORD', "admin")
+DB_HOST = os.environ.get('F1_DB_HOST', "localhost")
+DB_PORT = os.environ.get('F1_DB_PORT', "3306")
+DB_NAME = os.environ.get('F1_DB_NAME', "f1_db")
+
+# Embedded SQLite warehouse: a single local file, no server needed.
+SQLITE_PATH = os.environ.get('F1_SQLITE_PATH', 'data/warehouse/f1.db')
+
+# Default bulk-load strategy (a bulkload.STRATEGIES name) of every backend.
+BACKENDS = {
+    'mysql': {'strategy': 'executemany'},
+    'sqlite': {'strategy': 'sqlite_bulk'},
+}
+
+
+def database_uri(backend=None):
+    """Returns the SQLAlchemy URI of 'backend' (DB_BACKEND by default)."""
+    backend = backend or DB_BACKEND
+    if backend == 'mysql':
+        return f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    if backend == 'sqlite':
+        return f"sqlite:///{SQLITE_PATH}"
+    raise ValueError(f"Unknown storage backend '{backend}'; choose one of {sorted(BACKENDS)}.")
+
+
+def _tune_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers query the warehouse while a load is writing, and makes
+    # synchronous=NORMAL safe: commits no longer wait for an fsync.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+def create_database_engine(backend=None):
+    """
+    Creates the engine of a storage backend. Nothing connects at import
+    time: the loader calls this once loading actually starts. SQLAlchemy
+    and the database driver are only imported here.
+
+    Args:
+        backend (str, optional): One of BACKENDS; DB_BACKEND by default.
+
+    Returns:
+        Engine: The warehouse engine.
+    """
+    from sqlalchemy import create_engine, event
+
+    backend = backend or DB_BACKEND
+    uri = database_uri(backend)
+    if backend == 'mysql':
+        # local_infile lets the 'load_data_infile' bulk-load strategy stream CSVs to the server.
+        engine = create_engine(uri, connect_args={'local_infile': True})
+    else:
+        directory = os.path.dirname(SQLITE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        engine = create_engine(uri)
+        event.listen(engine, 'connect', _tune_sqlite)
+    print(f"Database engine created successfully ({backend}).")
+    return engine
@@ -1,110 +1,333 @@
+import os
+import threading
+
+import numpy as np
 import pandas as pd
 
+from compact import compact_dtypes, frame_memory
+from constructorindex import ConstructorIndex
+from keyregistry import KeyRegistry
+from schemas import RAW_SCHEMAS
+from sharding import SeasonShardPool
+from snapshots import merge_snapshots, snapshot_files
+from timeparse import to_milliseconds
+
+
+def _raw_property(name):
+    """Builds a read-only attribute that loads the raw 'name' file on first access."""
+    return property(lambda self: self._load_raw(name))
+
+
 class F1ETQualifyProcessor:
     """
     A class to handle the Extraction and Transformation of F1 data,
     including data cleaning and validation.
     """
-    def __init__(self, data_path='.'):
+    # For dimensions
+    df_drivers_raw = _raw_property('drivers')
+    df_constructors_raw = _raw_property('constructors')
+    df_circuits_raw = _raw_property('circuits')
+    df_races_raw = _raw_property('races')
+    df_status_raw = _raw_property('status')
+    # For facts
+    df_qualifying_raw = _raw_property('qualifying')
+    df_pit_stops_raw = _raw_property('pit_stops')
+    df_results_raw = _raw_property('results')
+    # Championship standings, to check the season aggregates against
+    df_driver_standings_raw = _raw_property('driver_standings')
+    df_constructor_standings_raw = _raw_property('constructor_standings')
+
+    def __init__(self, data_path='.', csv_engine='c', cache=None, registries=None, metrics=None, compact=True, shard_workers=None):
         """
-        Initializes the processor by loading all necessary raw data into memory.
+        Initializes the processor. Raw files are not read here: each one is
+        loaded, with its declared schema, the first time a process_* method
+        needs it.
+
+        Args:
+            data_path (str): Directory holding the raw CSV files.
+            csv_engine (str): pandas CSV engine, 'c' or 'pyarrow'.
+            cache (RawDataCache, optional): Cache of parsed raw files.
+            registries (dict, optional): KeyRegistry per dimension ('driver',
+                'constructor', 'race') from earlier runs; known keys keep their ids.
+            metrics (RunMetrics, optional): Receives the input, output and
+                dropped row counts of every table.
+            compact (bool): Give every processed frame compact dtypes
+                (downcast integers, categorical strings).
+            shard_workers (int, optional): Run the process_fact_* transforms
+                over season shards in this many worker processes; the
+                output is the same as in-process. Call close() when done.
         """
-        print("Initializing F1ETLProcessor: Loading raw data...")
+        print("Initializing F1ETLProcessor...")
         self.data_path = data_path
+        self.csv_engine = csv_engine
+        self.cache = cache
+        self.metrics = metrics
+        self.compact = compact
+        self.shard_workers = shard_workers
+        self._shard_pool = None
+        self._shard_pool_lock = threading.Lock()
+        # Bytes of every processed table before and after compaction.
+        self.memory_usage = {}
+        self.registries = registries if registries is not None else {}
+        for name in ('driver', 'constructor', 'race'):
+            self.registries.setdefault(name, KeyRegistry(name))
+        # Natural keys of fact rows that had no surrogate, per 'table.column'.
+        self.unmapped_keys = {}
+        # Natural raceIds the fact tables are restricted to (None = all races).
+        self.race_scope = None
+        # First surrogate id given to the pit stops of this run.
+        self.next_pit_stop_id = 1
+        # Merge statistics of every raw entity read from several snapshot files.
+        self.snapshot_stats = {}
+        self._raw = {}
+        # One lock per raw file, so concurrent stages read each file only once.
+        self._raw_locks = {name: threading.Lock() for name in RAW_SCHEMAS}
+        self._constructor_index = None
+        self._constructor_index_lock = threading.Lock()
+
+    def _load_raw(self, name):
+        """Reads a raw entity (one CSV file or its merged snapshots) using its schema in RAW_SCHEMAS, once per processor."""
+        with self._raw_locks[name]:
+            return self._load_raw_unlocked(name)
+
+    def _load_raw_unlocked(self, name):
+        if name not in self._raw:
+            schema = RAW_SCHEMAS[name]
+            if 'snapshots' in schema:
+                self._raw[name] = self._load_snapshots(name, schema)
+            else:
+                self._raw[name] = self._read_raw_file(f"{self.data_path}/{schema['file']}", schema)
+        return self._raw[name]
+
+    def _read_raw_file(self, path, schema):
+        """Parses one raw CSV file with 'schema', through the raw cache when there is one."""
+        # The pyarrow engine rejects rows with more fields than the header,
+        # and the C engine needs index_col=False not to use them as an index.
+        ragged = schema.get('ragged', False)
+        engine = 'c' if ragged else self.csv_engine
+        print(f"Loading raw data: {os.path.basename(path)}...")
+
+        def read():
+            return pd.read_csv(
+                path,
+                usecols=schema['usecols'],
+                dtype=schema['dtype'],
+                na_values=schema['na_values'],
+                engine=engine,
+                index_col=False if ragged else None,
+            )
+
         try:
-            # For dimensions
-            self.df_drivers_raw = pd.read_csv(f"{self.data_path}/drivers.csv")
-            self.df_constructors_raw = pd.read_csv(f"{self.data_path}/constructors.csv")
-            self.df_circuits_raw = pd.read_csv(f"{self.data_path}/circuits.csv")
-            self.df_races_raw = pd.read_csv(f"{self.data_path}/races.csv", usecols=range(8))
-            self.df_status_raw = pd.read_csv(f"{self.data_path}/status.csv", na_values=['\\N'])
-            # For facts
-            self.df_qualifying_raw = pd.read_csv(f"{self.data_path}/qualifying.csv")
-            self.df_pit_stops_raw = pd.read_csv(f"{self.data_path}/pit_stops.csv", na_values=['\\N'])
-            self.df_results_raw = pd.read_csv(f"{self.data_path}/results.csv", na_values=['\\N'])
-            print("All raw data loaded successfully.")
+            if self.cache is not None:
+                return self.cache.load(path, schema, read)
+            return read()
         except FileNotFoundError as e:
             print(f"Error loading data: {e}. Make sure CSV files are in the '{self.data_path}' directory.")
             raise
 
+    def _load_snapshots(self, name, schema):
+        """
+        Reads every snapshot file of a raw entity and merges them into one
+        frame. Each file is parsed (or served by the raw cache) on its own,
+        so unchanged snapshots are not parsed again when a new one arrives.
+        """
+        paths = snapshot_files(self.data_path, schema)
+        frames = [self._read_raw_file(path, schema) for path in paths]
+        df, stats = merge_snapshots(frames, schema['key'])
+        stats['files'] = [os.path.basename(path) for path in paths]
+        self.snapshot_stats[name] = stats
+        if self.metrics is not None:
+            self.metrics.count(f"snapshots:{name}", stats)
+        if len(paths) > 1:
+            print(
+                f"Merged {len(paths)} snapshots of '{name}': {stats['rows_read']} rows read, "
+                f"{stats['exact_duplicates']} exact duplicate(s), {stats['conflicting_keys']} conflicting key(s), "
+                f"{stats['rows_out']} rows kept."
+            )
+        return df
+
+    def _map_keys(self, table, registry_name, natural_keys):
+        """
+        Maps a fact column of natural keys through a KeyRegistry and records
+        the rows that could not be mapped in unmapped_keys.
+        """
+        ids = self.registries[registry_name].map(natural_keys)
+        self._record_unmapped(table, natural_keys, ids.isna())
+        return ids
 
+    def _record_unmapped(self, table, natural_keys, missing):
+        """Records the rows of 'table' dropped because their natural key in 'natural_keys' has no match."""
+        if missing.any():
+            entry = self.unmapped_keys.setdefault(f"{table}.{natural_keys.name}", {'rows': 0, 'keys': set()})
+            entry['rows'] += int(missing.sum())
+            entry['keys'].update(natural_keys[missing].dropna().astype(int).tolist())
 
-    def _time_to_milliseconds(self, time_str):
-        """Helper function to convert a time string 'M:SS.ms' to milliseconds."""
-        if pd.isna(time_str) or time_str == '\\N':
-            return None
-        try:
-            minutes, seconds = time_str.split(':')
-            total_seconds = int(minutes) * 60 + float(seconds)
-            return int(total_seconds * 1000)
-        except (ValueError, AttributeError):
-            return None
+    def report_unmapped_keys(self):
+        """Prints the rows dropped because a natural key had no surrogate id or parent row."""
+        if not self.unmapped_keys:
+            print("\nAll foreign keys were mapped.")
+            return
+        print("\nWARNING: Unmapped natural keys in processed tables:")
+        for column, entry in sorted(self.unmapped_keys.items()):
+            keys = sorted(entry['keys'])
+            sample = ', '.join(str(k) for k in keys[:10]) + (', ...' if len(keys) > 10 else '')
+            print(f"  {column}: {entry['rows']} row(s), {len(keys)} distinct key(s) [{sample}]")
+
+    def _finish(self, table, rows_in, df):
+        """Compacts the dtypes of a processed frame (or chunk) and records its row counts and memory."""
+        if self.metrics is not None:
+            self.metrics.record_rows(table, rows_in, len(df))
+        if not self.compact:
+            return df
+        before = frame_memory(df)
+        df = compact_dtypes(df)
+        after = frame_memory(df)
+        usage = self.memory_usage.setdefault(table, [0, 0])
+        usage[0] += before
+        usage[1] += after
+        if self.metrics is not None:
+            self.metrics.record_memory(table, before, after)
+        return df
+
+    def report_memory(self):
+        """Prints the memory of every processed table before and after dtype compaction."""
+        if not self.memory_usage:
+            return
+        print("\n** Processed Table Memory (MB) **")
+        for table, (before, after) in self.memory_usage.items():
+            saved = 100 * (1 - after / before) if before else 0.0
+            print(f"  {table:<24} {before / 2**20:8.2f} -> {after / 2**20:8.2f}  (-{saved:.0f}%)")
+
+    def constructor_index(self, chunksize=None):
+        """
+        Returns the (raceId, driverId) -> constructorId index over the raw
+        results, built on first use and then shared by every fact that needs
+        it. With 'chunksize', the results are read in chunks rather than whole.
+        """
+        with self._constructor_index_lock:
+            if self._constructor_index is None:
+                if chunksize is None:
+                    chunks = [self.df_results_raw]
+                else:
+                    chunks = (chunk[['raceId', 'driverId', 'constructorId']] for chunk in self.iter_raw('results', chunksize))
+                index = ConstructorIndex.from_results(chunks)
+                ambiguous = index.ambiguous[['raceId', 'driverId']].drop_duplicates()
+                if self.metrics is not None:
+                    self.metrics.count('constructor_index', {'keys': len(index), 'ambiguous_keys': len(ambiguous)})
+                if len(ambiguous):
+                    print(
+                        f"WARNING: {len(ambiguous)} (raceId, driverId) pair(s) in results have several "
+                        f"constructors; the first one in the file is used."
+                    )
+                self._constructor_index = index
+            return self._constructor_index
+
+    def _with_constructors(self, raw, index):
+        """Returns 'raw' with the constructorId of every (raceId, driverId) row, keeping its row labels."""
+        return raw.assign(constructorId=index.lookup(raw['raceId'], raw['driverId']))
+
+    def _run_sharded(self, table, raw):
+        """
+        Transforms the raw rows of a fact table in the season-sharded
+        process pool, which is started on first use, once the dimension key
+        registries are final.
+        """
+        with self._shard_pool_lock:
+            if self._shard_pool is None:
+                self._shard_pool = SeasonShardPool(self.shard_workers, self.registries)
+        races = self.df_races_raw
+        season_of = pd.Series(races['year'].to_numpy(), index=races['raceId'].to_numpy())
+        # Rows of unknown races form their own shard; the transform drops them.
+        row_years = season_of.reindex(raw['raceId'].to_numpy()).fillna(-1).to_numpy(dtype=np.int64)
+        df, unmapped = self._shard_pool.run(table, raw, row_years)
+        for column, entry in unmapped.items():
+            merged = self.unmapped_keys.setdefault(column, {'rows': 0, 'keys': set()})
+            merged['rows'] += entry['rows']
+            merged['keys'].update(entry['keys'])
+        return df
+
+    def _sharding(self, raw):
+        return bool(self.shard_workers) and self.shard_workers > 1 and len(raw) > 0
+
+    def close(self):
+        """Stops the worker processes of the season-sharded transforms, if any were started."""
+        with self._shard_pool_lock:
+            if self._shard_pool is not None:
+                self._shard_pool.shutdown()
+                self._shard_pool = None
+
+    def _scoped(self, df):
+        """Returns a copy of a raw fact frame restricted to the races in race_scope."""
+        if self.race_scope is None:
+            return df.copy()
+        return df[df['raceId'].isin(self.race_scope)].copy()
 
     def process_dim_drivers(self):
         """Processes drivers data, cleans it, and adds an 'Unknown' record."""
         print("Processing Dimension: Drivers...")
         df = self.df_drivers_raw.copy()
-        print("Initial number of records:", len(df))
+        rows_in = len(df)
         df.dropna(subset=['driverId'], inplace=True)
         df.drop_duplicates(subset=['driverId'], inplace=True)
         df['full_name'] = df['forename'] + ' ' + df['surname']
         df = df[['driverRef', 'full_name', 'dob', 'nationality', 'driverId']] 
-        df.insert(0, 'driver_id', range(1, len(df) + 1))
+        df.insert(0, 'driver_id', self.registries['driver'].assign(df['driverId']))
         df = df.rename(columns={'driverRef': 'driver_ref'})
 
-        self.driver_id_map = pd.Series(df.driver_id.values, index=df.driverId).to_dict()
-
         df = df.drop(columns=['driverId'])  
-        print("Processed number of records:", len(df))
-        return df
+        return self._finish('dim_drivers', rows_in, df)
 
     def process_dim_constructors(self):
         """Processes constructors data, cleans it, and adds an 'Unknown' record."""
         print("Processing Dimension: Constructors...")
         df = self.df_constructors_raw.copy()
+        rows_in = len(df)
 
         df.dropna(subset=['constructorId'], inplace=True)
         df.drop_duplicates(subset=['constructorId'], inplace=True)
         df = df[['constructorRef', 'name', 'nationality', 'constructorId']]  
-        df.insert(0, 'constructor_id', range(1, len(df) + 1))
+        df.insert(0, 'constructor_id', self.registries['constructor'].assign(df['constructorId']))
         df = df.rename(columns={'constructorRef': 'constructor_ref'})
-        self.constructor_id_map = pd.Series(df.constructor_id.values, index=df.constructorId).to_dict()
         df = df.drop(columns=['constructorId'])  
-        print("Processed number of records:", len(df))
-        return df
+        return self._finish('dim_constructors', rows_in, df)
 
     def process_dim_circuits(self):
         """Processes circuits data, cleans it, and adds an 'Unknown' record."""
         print("Processing Dimension: Circuits...")
         df = self.df_circuits_raw.copy()
+        rows_in = len(df)
         df.dropna(subset=['circuitId'], inplace=True)
         df.drop_duplicates(subset=['circuitId'], inplace=True)
         df = df[['circuitId', 'circuitRef', 'name', 'location', 'country']]
         df = df.rename(columns={'circuitId': 'circuit_id', 'circuitRef': 'circuit_ref'})
-        return df
+        return self._finish('dim_circuits', rows_in, df)
 
     def process_dim_races(self):
         """
         Processes races data, cleans it, and replaces null dates
-        with a placeholder value ('1900-01-01').
+        with a placeholder value ('1900-01-01'). Races at circuits missing
+        from the circuits data are dropped and reported as unmapped keys.
         """
 
         print("Processing Dimension: Races...")
         df = self.df_races_raw.copy()
+        rows_in = len(df)
         placeholder_date = pd.to_datetime('1900-01-01')
         df['date'] = pd.to_datetime(df['date'], errors='coerce')
         df['date'].fillna(placeholder_date)
         df['time'] = df['time'].replace('\\N', '00:00:00')
         df.dropna(subset=['raceId'], inplace=True)
         df.drop_duplicates(subset=['raceId'], inplace=True)
+        # Newer race snapshots can reference circuits circuits.csv does not have yet.
+        unknown_circuit = ~df['circuitId'].isin(self.df_circuits_raw['circuitId'])
+        self._record_unmapped('dim_races', df['circuitId'], unknown_circuit)
+        df = df[~unknown_circuit]
         df = df[['year', 'round', 'circuitId', 'name', 'date', 'time', 'raceId']] 
-        df.insert(0, 'race_id', range(1, len(df) + 1))
+        df.insert(0, 'race_id', self.registries['race'].assign(df['raceId']))
         df = df.rename(columns={'circuitId': 'circuit_id'})
 
-        self.race_id_map = pd.Series(df.race_id.values, index=df.raceId).to_dict()
-
         df = df.drop(columns=['raceId']) 
-        return df
+        return self._finish('dim_races', rows_in, df)
 
     def process_fact_qualifying(self):
         """
@@ -112,18 +335,26 @@ class F1ETQualifyProcessor:
         mapping foreign keys from the processed dimension tables.
         """
         print("Processing Fact Table: Qualifying...")
-        df = self.df_qualifying_raw.copy()
+        raw = self._scoped(self.df_qualifying_raw)
+        rows_in = len(raw)
+        if self._sharding(raw):
+            df = self._run_sharded('fact_qualifying', raw)
+        else:
+            df = self._transform_qualifying(raw)
+        return self._finish('fact_qualifying', rows_in, df)
 
-        df['race_id'] = df['raceId'].map(self.race_id_map)
-        df['driver_id'] = df['driverId'].map(self.driver_id_map)
-        df['constructor_id'] = df['constructorId'].map(self.constructor_id_map)
-        df.dropna(subset=['driver_id', 'constructor_id'], inplace=True)
+    def _transform_qualifying(self, df):
+        """Applies the qualifying transform to raw rows (the whole file or one chunk)."""
+        df['race_id'] = self._map_keys('fact_qualifying', 'race', df['raceId'])
+        df['driver_id'] = self._map_keys('fact_qualifying', 'driver', df['driverId'])
+        df['constructor_id'] = self._map_keys('fact_qualifying', 'constructor', df['constructorId'])
+        df.dropna(subset=['race_id', 'driver_id', 'constructor_id'], inplace=True)
         df[['race_id', 'driver_id', 'constructor_id']] = df[['race_id', 'driver_id', 'constructor_id']].astype(int)
 
         # --- Fact Transformation ---
-        df['q1_time_ms'] = df['q1'].apply(self._time_to_milliseconds)
-        df['q2_time_ms'] = df['q2'].apply(self._time_to_milliseconds)
-        df['q3_time_ms'] = df['q3'].apply(self._time_to_milliseconds)
+        df['q1_time_ms'] = to_milliseconds(df['q1'])
+        df['q2_time_ms'] = to_milliseconds(df['q2'])
+        df['q3_time_ms'] = to_milliseconds(df['q3'])
 
         time_cols = ['q1_time_ms', 'q2_time_ms', 'q3_time_ms']
         for col in time_cols:
@@ -141,14 +372,13 @@ class F1ETQualifyProcessor:
         """Processes status data to create the DimStatus dimension."""
         print("Processing Dimension: Status...")
         df = self.df_status_raw.copy()
+        rows_in = len(df)
         
         df.dropna(subset=['statusId'], inplace=True)
         df.drop_duplicates(subset=['statusId'], inplace=True)
         
         df = df.rename(columns={'statusId': 'status_id', 'status': 'status_description'})
-        self.status_id_map = pd.Series(df.status_id.values, index=df.status_id).to_dict()
-        
-        return df
+        return self._finish('dim_status', rows_in, df)
     
     def process_fact_pit_stops(self):
         """
@@ -156,16 +386,25 @@ class F1ETQualifyProcessor:
         and maps foreign keys to the new sequential IDs.
         """
         print("Processing Fact Table: Pit Stops...")
-        df = self.df_pit_stops_raw.copy()
-
-        constructor_lookup = self.df_results_raw[['raceId', 'driverId', 'constructorId']].drop_duplicates()
-        
-        # Join (merge) the pit stop data with the lookup table.
-        df = pd.merge(df, constructor_lookup, on=['raceId', 'driverId'], how='left')
+        raw = self._with_constructors(self._scoped(self.df_pit_stops_raw), self.constructor_index())
+        rows_in = len(raw)
+        if self._sharding(raw):
+            df = self._run_sharded('fact_pit_stops', raw)
+            # Shards number their stops independently; renumber in file order.
+            df['pit_stop_id'] = np.arange(self.next_pit_stop_id, self.next_pit_stop_id + len(df))
+        else:
+            df = self._transform_pit_stops(raw, self.next_pit_stop_id)
+        return self._finish('fact_pit_stops', rows_in, df)
 
-        df['race_id'] = df['raceId'].map(self.race_id_map)
-        df['driver_id'] = df['driverId'].map(self.driver_id_map)
-        df['constructor_id'] = df['constructorId'].map(self.constructor_id_map)
+    def _transform_pit_stops(self, df, first_id):
+        """
+        Applies the pit stop transform to raw rows (the whole file or one chunk)
+        that already carry their constructorId (see _with_constructors),
+        numbering the surviving stops from 'first_id'.
+        """
+        df['race_id'] = self._map_keys('fact_pit_stops', 'race', df['raceId'])
+        df['driver_id'] = self._map_keys('fact_pit_stops', 'driver', df['driverId'])
+        df['constructor_id'] = self._map_keys('fact_pit_stops', 'constructor', df['constructorId'])
 
         # Remove any stops that could not be mapped to a valid race, driver, or constructor.
         fk_columns = ['race_id', 'driver_id', 'constructor_id']
@@ -174,7 +413,7 @@ class F1ETQualifyProcessor:
 
         df = df.rename(columns={'stop': 'stop_number', 'milliseconds': 'duration_ms'})
         
-        df.insert(0, 'pit_stop_id', range(1, len(df) + 1))
+        df.insert(0, 'pit_stop_id', range(first_id, first_id + len(df)))
         
         final_columns = [
             'pit_stop_id', 'race_id', 'driver_id', 'constructor_id',
@@ -190,12 +429,20 @@ class F1ETQualifyProcessor:
         calculates derived metrics, and selects relevant facts.
         """
         print("Processing Fact Table: Race Results...")
-        df = self.df_results_raw.copy()
+        raw = self._scoped(self.df_results_raw)
+        rows_in = len(raw)
+        if self._sharding(raw):
+            df = self._run_sharded('fact_race_results', raw)
+        else:
+            df = self._transform_race_results(raw)
+        return self._finish('fact_race_results', rows_in, df)
 
+    def _transform_race_results(self, df):
+        """Applies the race results transform to raw rows (the whole file or one chunk)."""
         # --- 1. ID Mapping (Translation) ---
-        df['race_id'] = df['raceId'].map(self.race_id_map)
-        df['driver_id'] = df['driverId'].map(self.driver_id_map)
-        df['constructor_id'] = df['constructorId'].map(self.constructor_id_map)
+        df['race_id'] = self._map_keys('fact_race_results', 'race', df['raceId'])
+        df['driver_id'] = self._map_keys('fact_race_results', 'driver', df['driverId'])
+        df['constructor_id'] = self._map_keys('fact_race_results', 'constructor', df['constructorId'])
         # The statusId is already the correct key, no map needed.
         df['status_id'] = df['statusId']
 
@@ -213,7 +460,7 @@ class F1ETQualifyProcessor:
         df['positions_gained'] = df['grid'] - df['position']
 
         # --- 4. Fact Transformation and Final Selection ---
-        df['fastest_lap_time_ms'] = df['fastestLapTime'].apply(self._time_to_milliseconds)
+        df['fastest_lap_time_ms'] = to_milliseconds(df['fastestLapTime'])
         
         # Clean and fill nulls in numeric metrics with 0.
         numeric_facts = ['points', 'laps', 'fastestLap', 'rank', 'fastestLapSpeed', 'milliseconds', 'positions_gained']
@@ -251,8 +498,86 @@ class F1ETQualifyProcessor:
         df['fastest_lap_time_ms'] = df['fastest_lap_time_ms'].astype(int)
         df['fastest_lap_speed'] = df['fastest_lap_speed'].astype(float)
 
-        # --- 6. Print Data Types for Verification ---
-        print("\nData Types of fact_race_results DataFrame:")
-        print(df.dtypes)
-
         return df
+
+    def _final_standings(self, raw, natural_key, registry_name, key):
+        """
+        Returns the standings after the last race of every season, with the
+        season year and surrogate keys.
+        """
+        races = self.df_races_raw[['raceId', 'year', 'round']]
+        df = raw.merge(races, on='raceId', how='inner')
+        if self.race_scope is not None:
+            years = races.loc[races['raceId'].isin(self.race_scope), 'year'].unique()
+            df = df[df['year'].isin(years)]
+        last_round = df.groupby('year')['round'].transform('max')
+        df = df[df['round'] == last_round].copy()
+        df[key] = self._map_keys(f"{registry_name}_standings", registry_name, df[natural_key])
+        df = df.dropna(subset=[key])
+        df[key] = df[key].astype(int)
+        return df[['year', key, 'points', 'wins']].reset_index(drop=True)
+
+    def process_driver_standings(self):
+        """
+        Processes driver_standings.csv into the final points and wins of every
+        driver per season (restricted to the seasons of race_scope, if set).
+        """
+        print("Processing Standings: Drivers...")
+        return self._final_standings(self.df_driver_standings_raw, 'driverId', 'driver', 'driver_id')
+
+    def process_constructor_standings(self):
+        """
+        Processes constructor_standings.csv into the final points and wins of
+        every constructor per season (restricted to the seasons of race_scope, if set).
+        """
+        print("Processing Standings: Constructors...")
+        return self._final_standings(self.df_constructor_standings_raw, 'constructorId', 'constructor', 'constructor_id')
+
+    def iter_raw(self, name, chunksize):
+        """
+        Reads a raw fact file in chunks of 'chunksize' rows with its declared
+        schema, restricted to race_scope. Nothing is kept between chunks.
+        """
+        schema = RAW_SCHEMAS[name]
+        reader = pd.read_csv(
+            f"{self.data_path}/{schema['file']}",
+            usecols=schema['usecols'],
+            dtype=schema['dtype'],
+            na_values=schema['na_values'],
+            chunksize=chunksize,
+        )
+        with reader:
+            for chunk in reader:
+                if self.race_scope is not None:
+                    chunk = chunk[chunk['raceId'].isin(self.race_scope)]
+                yield chunk
+
+    def iter_fact_qualifying(self, chunksize=100_000):
+        """Streaming version of process_fact_qualifying: yields the fact table chunk by chunk."""
+        print("Streaming Fact Table: Qualifying...")
+        for chunk in self.iter_raw('qualifying', chunksize):
+            rows_in = len(chunk)
+            df = self._transform_qualifying(chunk)
+            yield self._finish('fact_qualifying', rows_in, df)
+
+    def iter_fact_pit_stops(self, chunksize=100_000):
+        """
+        Streaming version of process_fact_pit_stops. Only the constructor
+        index over results (two int64 arrays) is held in memory.
+        """
+        print("Streaming Fact Table: Pit Stops...")
+        index = self.constructor_index(chunksize)
+        next_id = self.next_pit_stop_id
+        for chunk in self.iter_raw('pit_stops', chunksize):
+            rows_in = len(chunk)
+            df = self._transform_pit_stops(self._with_constructors(chunk, index), next_id)
+            next_id += len(df)
+            yield self._finish('fact_pit_stops', rows_in, df)
+
+    def iter_fact_race_results(self, chunksize=100_000):
+        """Streaming version of process_fact_race_results: yields the fact table chunk by chunk."""
+        print("Streaming Fact Table: Race Results...")
+        for chunk in self.iter_raw('results', chunksize):
+            rows_in = len(chunk)
+            df = self._transform_race_results(chunk)
+            yield self._finish('fact_race_results', rows_in, df)
@@ -0,0 +1,106 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from keyregistry import KeyRegistry
+from schemas import STAGE_INPUTS
+
+# Raw fact inputs whose rows decide whether a race has to be reprocessed.
+FACT_SOURCES = STAGE_INPUTS['race_fingerprints']
+
+
+def _race_hash_sums(df):
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    # Summing makes the fingerprint independent of row order within a race.
+    return row_hashes.groupby(df['raceId'].values).sum()
+
+
+def race_fingerprints(processor, chunksize=None):
+    """
+    Computes one fingerprint per natural raceId from the raw fact rows of
+    that race, using vectorized row hashing.
+
+    Args:
+        processor (F1ETQualifyProcessor): Source of the raw fact files.
+        chunksize (int, optional): Hash the files chunk by chunk instead of
+            loading them whole; the result is the same.
+
+    Returns:
+        pd.Series: uint64 fingerprints indexed by raceId.
+    """
+    per_source = []
+    for name in FACT_SOURCES:
+        if chunksize is None:
+            per_source.append(_race_hash_sums(getattr(processor, f"df_{name}_raw")))
+            continue
+        # Sums are additive, so per-chunk sums can be combined afterwards.
+        chunk_sums = [_race_hash_sums(chunk) for chunk in processor.iter_raw(name, chunksize)]
+        sums = pd.concat(chunk_sums)
+        per_source.append(sums.groupby(level=0).sum())
+
+    races = per_source[0].index
+    for sums in per_source[1:]:
+        races = races.union(sums.index)
+    total = np.zeros(len(races), dtype=np.uint64)
+    for sums in per_source:
+        # Reindexing with an integer fill value keeps the hashes exact (no float64 detour).
+        total += sums.reindex(races, fill_value=0).to_numpy(dtype=np.uint64)
+    return pd.Series(total, index=races)
+
+
+class EtlState:
+    """
+    Watermark of the warehouse between runs: the surrogate key registries,
+    the fingerprint of every race already loaded and the next free pit stop
+    id. The fingerprints are stored as JSON and every key registry as a .npy
+    file in a 'keys' directory next to it.
+    """
+    KEY_REGISTRIES = ['driver', 'constructor', 'race']
+
+    def __init__(self, path):
+        self.path = path
+        self.registries = {
+            name: KeyRegistry.load(name, self._registry_path(name)) for name in self.KEY_REGISTRIES
+        }
+        self.race_fingerprints = {}
+        self.next_pit_stop_id = 1
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.race_fingerprints = {int(k): v for k, v in saved.get('race_fingerprints', {}).items()}
+            self.next_pit_stop_id = saved.get('next_pit_stop_id', 1)
+
+    def _registry_path(self, name):
+        return os.path.join(os.path.dirname(self.path), 'keys', f'{name}.npy')
+
+    def pending_races(self, fingerprints):
+        """Returns the natural raceIds that are new or whose raw fact rows changed."""
+        return sorted(
+            int(race) for race, fingerprint in fingerprints.items()
+            if self.race_fingerprints.get(int(race)) != int(fingerprint)
+        )
+
+    def record(self, fingerprints, races, next_pit_stop_id):
+        """Marks 'races' as loaded. The registries are shared with the processor and need no merge."""
+        for race in races:
+            self.race_fingerprints[int(race)] = int(fingerprints[race])
+        self.next_pit_stop_id = next_pit_stop_id
+
+    def save(self):
+        """Writes the state atomically, so an interrupted run keeps the previous watermark."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Keys that vanished from the raw files keep their ids for good.
+        for name, registry in self.registries.items():
+            registry.save(self._registry_path(name))
+        payload = {
+            'race_fingerprints': {str(k): v for k, v in self.race_fingerprints.items()},
+            'next_pit_stop_id': int(self.next_pit_stop_id),
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
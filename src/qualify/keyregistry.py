@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class KeyRegistry:
+    """
+    Natural-to-surrogate key mapping for one dimension, stored as a dense
+    NumPy lookup array: lookup[natural_key] is the surrogate id, 0 meaning
+    "not assigned". Natural keys are the small non-negative integer ids of
+    the Ergast files, so a lookup is a single vectorized take.
+    """
+    def __init__(self, name, lookup=None):
+        self.name = name
+        self.lookup = np.zeros(1, dtype=np.int64) if lookup is None else np.asarray(lookup, dtype=np.int64)
+
+    @classmethod
+    def load(cls, name, path):
+        """Reads a registry saved by save(), or returns an empty one if the file does not exist."""
+        if not os.path.exists(path):
+            return cls(name)
+        return cls(name, np.load(path))
+
+    def save(self, path):
+        """Writes the lookup array atomically as a .npy file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, self.lookup)
+        os.replace(tmp_path, path)
+
+    @property
+    def next_id(self):
+        return int(self.lookup.max()) + 1
+
+    def __len__(self):
+        return int(np.count_nonzero(self.lookup))
+
+    def _grow(self, max_key):
+        if max_key >= len(self.lookup):
+            grown = np.zeros(int(max_key) + 1, dtype=np.int64)
+            grown[:len(self.lookup)] = self.lookup
+            self.lookup = grown
+
+    def _positions(self, natural_keys):
+        """Returns (keys as int64, mask of keys that index into the lookup array)."""
+        values = pd.Series(natural_keys, copy=False)
+        present = values.notna().to_numpy()
+        keys = np.zeros(len(values), dtype=np.int64)
+        keys[present] = values[present].to_numpy(dtype=np.int64)
+        in_range = present & (keys >= 0) & (keys < len(self.lookup))
+        return keys, present, in_range
+
+    def assign(self, natural_keys):
+        """
+        Returns the surrogate id of every natural key, giving unseen keys new
+        ids after the largest one, in order of first appearance.
+
+        Returns:
+            np.ndarray: int64 surrogate ids.
+        """
+        keys, present, _ = self._positions(natural_keys)
+        if not present.all():
+            raise ValueError(f"Cannot assign '{self.name}' surrogate keys to missing natural keys.")
+        if (keys < 0).any():
+            raise ValueError(f"Natural keys of '{self.name}' must be non-negative integers.")
+        if len(keys):
+            self._grow(keys.max())
+        unseen = pd.unique(keys[self.lookup[keys] == 0])
+        start = self.next_id
+        self.lookup[unseen] = np.arange(start, start + len(unseen), dtype=np.int64)
+        return self.lookup[keys]
+
+    def map(self, natural_keys):
+        """
+        Translates natural keys to surrogate ids without assigning new ones.
+
+        Returns:
+            pd.Series: Nullable 'Int64' ids aligned with the input; <NA> where
+            the natural key is missing or has no surrogate.
+        """
+        series = pd.Series(natural_keys, copy=False)
+        keys, _, in_range = self._positions(series)
+        ids = np.zeros(len(keys), dtype=np.int64)
+        ids[in_range] = self.lookup[keys[in_range]]
+        return pd.Series(pd.arrays.IntegerArray(ids, ids == 0), index=series.index)
+
+    def to_dict(self):
+        """Returns the mapping as a {natural: surrogate} dict."""
+        naturals = np.flatnonzero(self.lookup)
+        return dict(zip(naturals.tolist(), self.lookup[naturals].tolist()))
@@ -1,16 +1,114 @@
+import os
+import threading
+
 from sqlalchemy.engine import Engine
 
+from bulkload import STAGING_SUFFIX, ToSqlStrategy, python_values, staging_tables, swap_in_staging
+
 class DatabaseLoader:
     """
     Class responsible for loading the processed DataFrames into the database.
     """
-    def __init__(self, engine: Engine):
+    DIMENSIONS = ['dim_drivers', 'dim_constructors', 'dim_circuits', 'dim_races', 'dim_status']
+    FACTS = ['fact_qualifying', 'fact_pit_stops', 'fact_race_results']
+    AGGREGATES = ['agg_driver_season', 'agg_constructor_season']
+
+    def __init__(self, engine: Engine = None, strategy=None, use_staging=False, backend=None):
         """
         Initializes the loader with the database engine.
+
+        Args:
+            engine (Engine, optional): Target database. Without one, the engine
+                of 'backend' is created on first use, so nothing connects
+                until loading actually starts.
+            strategy (optional): Bulk-load strategy from bulkload.STRATEGIES;
+                defaults to ToSqlStrategy.
+            use_staging (bool): Load into '<table>_staging' copies and swap them
+                in atomically at the end, so readers never see a partial load.
+            backend (str, optional): Storage backend from database.BACKENDS
+                used when no engine is given; database.DB_BACKEND by default.
         """
-        self.engine = engine
+        self._engine = engine
+        self.backend = backend
+        self.strategy = strategy or ToSqlStrategy()
+        self.use_staging = use_staging
+        self._target = None
+        self._suffix = ''
+        self._engine_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        """The target engine, created on first access when none was given."""
+        with self._engine_lock:
+            if self._engine is None:
+                from database import create_database_engine
+                self._engine = create_database_engine(self.backend)
+            return self._engine
 
-    def load_data(self, dim_drivers, dim_constructors, dim_circuits, dim_races, dim_status, fact_qualifying, fact_pit_stops, fact_race_results):
+    def begin_load(self):
+        """
+        Prepares the target tables of a full load: fresh '<table>_staging'
+        copies when staging is on, otherwise drops and recreates the live tables.
+        """
+        from models import Base, create_all_tables
+
+        if self.use_staging:
+            self._target = staging_tables(Base.metadata)
+            self._suffix = STAGING_SUFFIX
+            print("Creating staging tables...")
+            self._target.drop_all(self.engine)
+            self._target.create_all(self.engine)
+        else:
+            self._target = Base.metadata
+            self._suffix = ''
+            create_all_tables(self.engine)
+        print(f"Loading with strategy '{self.strategy.name}'...")
+
+    def load_table(self, name, df, csv_dir=None):
+        """
+        Loads one table of a full load, in its own transaction. Dimensions
+        must be loaded before the facts that reference them.
+
+        Args:
+            name (str): Table name, e.g. 'dim_drivers'.
+            df (pd.DataFrame): Processed frame of that table.
+            csv_dir (str, optional): Directory of the processed CSVs, for
+                strategies that stream from files.
+        """
+        table = self._target.tables[name + self._suffix]
+        csv_path = os.path.join(csv_dir, f"{name}.csv") if csv_dir is not None else None
+        with self.engine.begin() as connection:
+            self.strategy.load(connection, table, df, csv_path=csv_path)
+
+    def _build_access_paths(self, suffix=''):
+        """Creates the secondary indexes of the loaded tables."""
+        from models import INDEXES, create_indexes
+
+        create_indexes(self.engine, {name + suffix: indexes for name, indexes in INDEXES.items()})
+
+    def finish_load(self):
+        """
+        Makes a full load visible: builds the indexes on the loaded
+        tables, then swaps the staging tables in when staging is on.
+
+        On MySQL index names are per table, so the staging tables get their
+        indexes before the swap. SQLite index names are global and still
+        taken by the live tables, so there they are built right after it.
+        """
+        from models import Base
+
+        if self.use_staging:
+            if self.engine.dialect.name == 'mysql':
+                self._build_access_paths(STAGING_SUFFIX)
+            print("Swapping staging tables in...")
+            swap_in_staging(self.engine, Base.metadata)
+            if self.engine.dialect.name != 'mysql':
+                self._build_access_paths()
+        else:
+            self._build_access_paths()
+        print("\nData Loading Successfully Completed ")
+
+    def load_data(self, dim_drivers, dim_constructors, dim_circuits, dim_races, dim_status, fact_qualifying, fact_pit_stops, fact_race_results, csv_dir=None, aggregates=None):
         """
         Executes the complete loading pipeline.
         
@@ -23,28 +121,161 @@ class DatabaseLoader:
             fact_qualifying (pd.DataFrame): DataFrame of qualifying.
             fact_pit_stops (pd.DataFrame): DataFrame of pit stops.
             fact_race_results (pd.DataFrame): DataFrame of race results.
+            csv_dir (str, optional): Directory of the processed CSVs, for
+                strategies that stream from files.
+            aggregates (dict, optional): Season aggregate frames by table name;
+                the aggregate tables stay empty without them.
         """
-        
-        from models import create_all_tables
-        create_all_tables(self.engine)
-        
+        frames = {
+            'dim_drivers': dim_drivers,
+            'dim_constructors': dim_constructors,
+            'dim_circuits': dim_circuits,
+            'dim_races': dim_races,
+            'dim_status': dim_status,
+            'fact_qualifying': fact_qualifying,
+            'fact_pit_stops': fact_pit_stops,
+            'fact_race_results': fact_race_results,
+        }
+
+        self.begin_load()
         try:
             print("Loading dimension tables...")
-            dim_drivers.to_sql('dim_drivers', con=self.engine, if_exists='append', index=False)
-            dim_constructors.to_sql('dim_constructors', con=self.engine, if_exists='append', index=False)
-            dim_circuits.to_sql('dim_circuits', con=self.engine, if_exists='append', index=False)
-            dim_races.to_sql('dim_races', con=self.engine, if_exists='append', index=False)
-            dim_status.to_sql('dim_status', con=self.engine, if_exists='append', index=False)
+            for name in self.DIMENSIONS:
+                self.load_table(name, frames[name], csv_dir)
             print("Dimension tables loaded successfully.")
 
             print("Loading fact tables...")
-            fact_qualifying.to_sql('fact_qualifying', con=self.engine, if_exists='append', index=False, chunksize=10000)
-            fact_pit_stops.to_sql('fact_pit_stops', con=self.engine, if_exists='append', index=False, chunksize=10000)
-            fact_race_results.to_sql('fact_race_results', con=self.engine, if_exists='append', index=False, chunksize=10000)
+            for name in self.FACTS:
+                self.load_table(name, frames[name], csv_dir)
             print("Fact tables loaded successfully.")
+
+            for name, df in (aggregates or {}).items():
+                self.load_table(name, df, csv_dir)
             
         except Exception as e:
             print(f"An error occurred during data loading: {e}")
             raise
-            
-        print("\nData Loading Successfully Completed ")
\ No newline at end of file
+
+        self.finish_load()
+
+    def load_tables(self, frames):
+        """
+        Reloads some of the tables in place, for runs that rebuild only part
+        of the warehouse. Dimensions are upserted, so rows the other tables
+        still reference stay; every other table is emptied and reloaded.
+        Everything runs in one transaction.
+
+        Args:
+            frames (dict): Processed frame per table name.
+        """
+        from models import Base, ensure_all_tables
+        ensure_all_tables(self.engine)
+
+        try:
+            with self.engine.begin() as connection:
+                # Parents first, so foreign keys are satisfied row by row.
+                for table in Base.metadata.sorted_tables:
+                    if table.name not in frames:
+                        continue
+                    if table.name in self.DIMENSIONS:
+                        print(f"Upserting '{table.name}'...")
+                        self._upsert(connection, table.name, frames[table.name])
+                    else:
+                        print(f"Replacing '{table.name}'...")
+                        connection.execute(table.delete())
+                        self.strategy.load(connection, table, frames[table.name])
+        except Exception as e:
+            print(f"An error occurred during data loading: {e}")
+            raise
+
+        self._build_access_paths()
+        print("\nData Loading Successfully Completed ")
+
+    def _upsert(self, connection, table_name, df):
+        """Inserts new rows and updates existing ones (matched on the primary key)."""
+        from models import Base
+
+        if df.empty:
+            return
+        table = Base.metadata.tables[table_name]
+        non_key_columns = [c.name for c in table.columns if not c.primary_key]
+        dialect = connection.dialect.name
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table)
+            stmt = stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in non_key_columns})
+        elif dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.name for c in table.primary_key],
+                set_={name: stmt.excluded[name] for name in non_key_columns},
+            )
+        else:
+            raise NotImplementedError(f"Upserts are not supported for the '{dialect}' dialect.")
+        connection.execute(stmt, python_values(table, df).to_dict(orient='records'))
+
+    def _replace_races(self, connection, table_name, df, race_ids):
+        """Deletes the rows of the given races from a fact table and appends their new rows."""
+        from models import Base
+
+        table = Base.metadata.tables[table_name]
+        race_ids = [int(r) for r in race_ids]
+        batch = 500
+        for start in range(0, len(race_ids), batch):
+            connection.execute(table.delete().where(table.c.race_id.in_(race_ids[start:start + batch])))
+        self.strategy.load(connection, table, df)
+
+    def _replace_seasons(self, connection, table_name, df, years):
+        """Deletes the rows of the given seasons from an aggregate table and appends their new rows."""
+        from models import Base
+
+        table = Base.metadata.tables[table_name]
+        connection.execute(table.delete().where(table.c.year.in_([int(y) for y in years])))
+        self.strategy.load(connection, table, df)
+
+    def load_incremental(self, dim_drivers, dim_constructors, dim_circuits, dim_races, dim_status, fact_qualifying, fact_pit_stops, fact_race_results, race_ids, aggregates=None, years=None):
+        """
+        Loads only what changed since the previous run, without dropping tables.
+        Dimensions are upserted; fact rows of 'race_ids' are replaced.
+        Everything runs in one transaction, so a failure leaves the warehouse as it was.
+
+        Args:
+            dim_* (pd.DataFrame): Full dimension DataFrames.
+            fact_* (pd.DataFrame): Fact DataFrames restricted to 'race_ids'.
+            race_ids (list): Surrogate race_id of every race being (re)loaded.
+            aggregates (dict, optional): Season aggregate and window metric
+                frames by table name, restricted to 'years'.
+            years (list, optional): Seasons whose rows of those tables are replaced.
+        """
+        from models import ensure_all_tables
+        ensure_all_tables(self.engine)
+
+        try:
+            with self.engine.begin() as connection:
+                print("Upserting dimension tables...")
+                self._upsert(connection, 'dim_drivers', dim_drivers)
+                self._upsert(connection, 'dim_constructors', dim_constructors)
+                self._upsert(connection, 'dim_circuits', dim_circuits)
+                self._upsert(connection, 'dim_races', dim_races)
+                self._upsert(connection, 'dim_status', dim_status)
+
+                print(f"Replacing fact rows of {len(race_ids)} race(s)...")
+                self._replace_races(connection, 'fact_qualifying', fact_qualifying, race_ids)
+                self._replace_races(connection, 'fact_pit_stops', fact_pit_stops, race_ids)
+                self._replace_races(connection, 'fact_race_results', fact_race_results, race_ids)
+
+                if aggregates:
+                    print(f"Refreshing season aggregates and window metrics of {len(years)} season(s)...")
+                    for name, df in aggregates.items():
+                        self._replace_seasons(connection, name, df, years)
+        except Exception as e:
+            print(f"An error occurred during incremental loading: {e}")
+            raise
+
+        # No-op when the tables already have them from an earlier full load.
+        self._build_access_paths()
+        print("\nIncremental Data Loading Successfully Completed ")
@@ -1,124 +1,576 @@
-from et import F1ETQualifyProcessor
-from loader import DatabaseLoader 
-from database import engine  
+import argparse
 import os
+import sys
 
-def check_for_nulls(df, table_name):
+from database import BACKENDS, DB_BACKEND
+from metrics import RunMetrics
+from scheduler import StageScheduler
+from schemas import RAW_SCHEMAS, STAGE_INPUTS
+
+# Only light modules are imported up front. pandas, SQLAlchemy and the
+# database driver are imported by the code that needs them, so '--help' and
+# '--dry-run' return at once and '--no-load' never touches the database.
+
+DIMENSIONS = ['dim_drivers', 'dim_constructors', 'dim_circuits', 'dim_races', 'dim_status']
+FACTS = ['fact_qualifying', 'fact_pit_stops', 'fact_race_results']
+AGGREGATE_TABLES = ['agg_driver_season', 'agg_constructor_season']
+METRIC_TABLES = ['metric_qualifying', 'metric_pit_stops', 'metric_driver_points']
+TABLES = DIMENSIONS + FACTS + AGGREGATE_TABLES + METRIC_TABLES
+
+# Dimensions whose surrogate key maps each fact transform reads.
+FACT_KEY_DIMENSIONS = ['dim_drivers', 'dim_constructors', 'dim_races']
+
+# Tables each table needs before it can be built and validated: the
+# dimensions whose keys it maps, the parents of its foreign keys in
+# models.py and, for the aggregates and window metrics, the facts they are
+# computed from.
+TABLE_DEPENDENCIES = {
+    'dim_races': ['dim_circuits'],
+    'fact_qualifying': FACT_KEY_DIMENSIONS,
+    'fact_pit_stops': FACT_KEY_DIMENSIONS,
+    'fact_race_results': FACT_KEY_DIMENSIONS + ['dim_status'],
+    'agg_driver_season': ['fact_race_results', 'fact_qualifying', 'dim_races', 'dim_drivers'],
+    'agg_constructor_season': ['fact_race_results', 'fact_qualifying', 'dim_races', 'dim_constructors'],
+    'metric_qualifying': ['fact_qualifying', 'dim_races', 'dim_drivers'],
+    'metric_pit_stops': ['fact_pit_stops', 'dim_races', 'dim_drivers'],
+    'metric_driver_points': ['fact_race_results', 'dim_races', 'dim_drivers'],
+}
+
+def required_tables(only=None):
     """
-    Checks if a DataFrame contains any null values in any column.
-    Prints a message indicating whether nulls were found and, if so,
-    which columns contain them.
+    Returns the tables 'only' needs, themselves included, in TABLES order.
+
+    Args:
+        only (list, optional): Table names; every table when None.
+    """
+    if only is None:
+        return list(TABLES)
+    needed = set()
+    pending = list(only)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(TABLE_DEPENDENCIES.get(name, []))
+    return [name for name in TABLES if name in needed]
+
+def output_tables(only=None):
+    """
+    Returns the tables a run writes and loads: every table, or the tables in
+    'only' plus the dimensions they need, which may hold new surrogate keys.
+    """
+    if only is None:
+        return list(TABLES)
+    return [name for name in required_tables(only) if name in only or name in DIMENSIONS]
+
+def required_raw_inputs(tables, fingerprints=True):
     """
-    null_counts = df.isnull().sum()
-    if null_counts.any():
-        print(f"\nWARNING: Null values found in table '{table_name}':")
-        for col, count in null_counts.items():
-            if count > 0:
-                print(f"  Column '{col}' has {count} null values.")
-        return True  
+    Returns the raw inputs (RAW_SCHEMAS names) read to build 'tables', in
+    order of first use, including the standings the aggregates are checked
+    against and, with 'fingerprints', the race fingerprint sources.
+    """
+    steps = [name for name in tables if name in STAGE_INPUTS]
+    if any(name in AGGREGATE_TABLES for name in tables):
+        steps += ['driver_standings', 'constructor_standings']
+    if fingerprints:
+        steps.append('race_fingerprints')
+    inputs = []
+    for step in steps:
+        inputs.extend(name for name in STAGE_INPUTS[step] if name not in inputs)
+    return inputs
+
+def build_pipeline(processor, state, db_loader, store, incremental=False, max_workers=4, stream_chunksize=None, metrics=None, validator=None, only=None, load=True):
+    """
+    Declares the ETL as a DAG of stages: one transform, one output write
+    and one load per table, plus the incremental scope and the watermark update.
+    Independent stages run concurrently; database stages run one at a time.
+
+    Processed tables are written through 'store' (a ProcessedStore), as
+    Parquet with the fact tables partitioned by season, plus CSV when that
+    export is on.
+
+    The season aggregate tables are built from the fact frames, or from the
+    processed fact tables when the facts are streamed or only some races were
+    reprocessed; incremental runs rebuild only the seasons of those races.
+    They are checked against the championship standings without blocking
+    the load. The window metric tables (gap to pole, teammate delta, pit
+    stop rank, cumulative season points) are built and refreshed the same
+    way, one stage per table.
+
+    With 'stream_chunksize', each fact table is instead produced by a single
+    streaming stage that reads, transforms, writes and loads it chunk by
+    chunk, so memory stays bounded by the chunk size. Only full loads can
+    stream.
+
+    Every table is checked by 'validator' (a DataValidator) before anything
+    is loaded; a failed check stops the run before the load begins. Streamed
+    fact chunks are checked one by one before they reach the staging tables.
+
+    With 'metrics', every stage is timed into that RunMetrics and the dtypes
+    of every processed table are recorded there.
+
+    With 'only', just the stages behind those tables run, so only their raw
+    inputs are read (see required_tables and output_tables). The dimensions
+    they need are upserted, the selected tables are replaced as a whole and
+    the race fingerprints are left alone; only full, non-streaming runs can
+    be narrowed this way. Without 'load' (and 'db_loader') nothing touches
+    the database and the watermark does not move.
+
+    Returns:
+        StageScheduler: The pipeline, ready to run.
+    """
+    from aggregates import AGGREGATES, build_aggregates, build_aggregates_from_processed, check_standings, race_years, report_standings_check
+    from incremental import race_fingerprints
+    from models import Base
+    from validation import DataValidator
+    from windows import WINDOW_METRICS, build_window_metric, build_window_metric_from_processed
+
+    if incremental and stream_chunksize is not None:
+        raise ValueError("Streaming fact tables is only supported for full loads.")
+    if only is not None:
+        unknown = set(only) - set(TABLES)
+        if unknown:
+            raise ValueError(f"Unknown table(s) {sorted(unknown)}; choose from {TABLES}.")
+        if incremental or stream_chunksize is not None:
+            raise ValueError("Only full, non-streaming runs can be restricted to some tables.")
+
+    scheduler = StageScheduler(max_workers=max_workers, metrics=metrics)
+    validator = validator or DataValidator()
+    needed = required_tables(only)
+    outputs = output_tables(only)
+    # Fingerprints pick the races of incremental runs and are recorded once a full load committed.
+    fingerprinted = incremental or (load and only is None)
+
+    def transform(name):
+        def run(*_):
+            df = getattr(processor, f"process_{name}")()
+            if metrics is not None:
+                metrics.record_table(name, df)
+            return df
+        return run
+
+    def transform_fact(name):
+        run_transform = transform(name)
+        def run(*inputs):
+            df = run_transform(*inputs)
+            return df, len(df)
+        return run
+
+    def validate(name):
+        parents = validator.parents(name)
+        def run(df, *parent_frames):
+            validator.validate(name, df, dict(zip(parents, parent_frames)))
+        return run
+
+    def stream_fact(name):
+        parents = validator.parents(name)
+        def run(*inputs):
+            parent_frames = dict(zip(parents, inputs))
+            years = race_years(parent_frames['dim_races'])
+            rows = 0
+            for part, chunk in enumerate(getattr(processor, f"iter_{name}")(stream_chunksize)):
+                if rows == 0 and metrics is not None:
+                    metrics.record_table(name, chunk)
+                validator.validate(name, chunk, parent_frames)
+                store.append(name, chunk, years, part)
+                if load:
+                    db_loader.load_table(name, chunk)
+                rows += len(chunk)
+            store.finish_stream(name)
+            print(f"Streamed {rows} rows into '{name}'.")
+            return None, None, rows
+        return run
+
+    def write_dimension(name):
+        def run(df):
+            store.write(name, df)
+        return run
+
+    def write_fact(name):
+        def run(df, race_ids, dim_races):
+            store.write(name, df, race_years(dim_races), race_ids if incremental else None)
+        return run
+
+    def scope(dim_races):
+        if not fingerprinted:
+            return None, None, dim_races['race_id'].tolist()
+        fingerprints = race_fingerprints(processor, chunksize=stream_chunksize)
+        if incremental:
+            pending_races = state.pending_races(fingerprints)
+            processor.race_scope = pending_races
+            processor.next_pit_stop_id = state.next_pit_stop_id
+            print(f"\nIncremental run: {len(pending_races)} new or changed race(s) to process.")
+        else:
+            pending_races = fingerprints.index.tolist()
+        race_ids = processor.registries['race'].map(pending_races).dropna().astype(int).tolist()
+        return fingerprints, pending_races, race_ids
+
+    for name in DIMENSIONS:
+        if name not in needed:
+            continue
+        scheduler.add(name, transform(name), outputs=[name])
+        if name in outputs:
+            scheduler.add(f"validate_{name}", validate(name), inputs=[name] + validator.parents(name), outputs=[f"valid:{name}"])
+            scheduler.add(f"write_{name}", write_dimension(name), inputs=[name], outputs=[f"out:{name}"])
+
+    facts = [name for name in FACTS if name in needed]
+    if facts:
+        scheduler.add('scope', scope, inputs=['dim_races'], outputs=['fingerprints', 'pending_races', 'race_ids'])
+
+    def parent_loads(name):
+        # Parent tables first, so foreign keys are satisfied row by row.
+        parents = sorted({fk.column.table.name for fk in Base.metadata.tables[name].foreign_keys})
+        return [f"load:{p}" for p in parents]
+
+    if stream_chunksize is None:
+        for name in facts:
+            scheduler.add(name, transform_fact(name), inputs=FACT_KEY_DIMENSIONS + ['race_ids'], outputs=[name, f"rows:{name}"])
+            if name in outputs:
+                scheduler.add(f"write_{name}", write_fact(name), inputs=[name, 'race_ids', 'dim_races'], outputs=[f"out:{name}"])
+                scheduler.add(f"validate_{name}", validate(name), inputs=[name] + validator.parents(name), outputs=[f"valid:{name}"])
+    else:
+        for name in facts:
+            scheduler.add(
+                f"stream_{name}", stream_fact(name),
+                inputs=validator.parents(name) + ['race_ids'] + (['load:begin'] + parent_loads(name) if load else []),
+                outputs=[f"out:{name}", f"load:{name}", f"rows:{name}"], resource='db' if load else None,
+            )
+
+    def aggregate(*inputs):
+        if stream_chunksize is None and not incremental:
+            tables = build_aggregates(*inputs)
+            years = None
+        else:
+            dim_races, race_ids = inputs[-2:]
+            years = None
+            if incremental:
+                years = sorted(dim_races.loc[dim_races['race_id'].isin(race_ids), 'year'].unique().tolist())
+            tables = build_aggregates_from_processed(store, dim_races, years, chunksize=stream_chunksize or 100_000)
+        if metrics is not None:
+            for name, df in tables.items():
+                metrics.record_table(name, df)
+        return (*[tables[name] for name in AGGREGATES], years)
+
+    if stream_chunksize is None and not incremental:
+        aggregate_inputs = ['fact_race_results', 'fact_qualifying', 'dim_races']
+    else:
+        aggregate_inputs = ['out:fact_race_results', 'out:fact_qualifying', 'dim_races', 'race_ids']
+    aggregated = any(name in needed for name in AGGREGATES)
+    if aggregated:
+        scheduler.add('aggregates', aggregate, inputs=aggregate_inputs, outputs=list(AGGREGATES) + ['aggregate_years'])
+
+    def write_aggregate(name):
+        def run(df, years):
+            store.write(name, df, years=years)
+        return run
+
+    for name in AGGREGATES:
+        if name in outputs:
+            scheduler.add(f"write_{name}", write_aggregate(name), inputs=[name, 'aggregate_years'], outputs=[f"out:{name}"])
+            scheduler.add(f"validate_{name}", validate(name), inputs=[name] + validator.parents(name), outputs=[f"valid:{name}"])
+
+    def standings_check(*aggregate_frames):
+        standings = {
+            'agg_driver_season': processor.process_driver_standings(),
+            'agg_constructor_season': processor.process_constructor_standings(),
+        }
+        checks = {}
+        for name, df in zip(AGGREGATES, aggregate_frames):
+            checks[name] = check_standings(df, standings[name], AGGREGATES[name])
+            report_standings_check(name, checks[name])
+            if metrics is not None:
+                mismatched = checks[name][(checks[name]['points_mismatches'] > 0) | (checks[name]['wins_mismatches'] > 0)]
+                metrics.count(f"standings_check:{name}", {
+                    'seasons': len(checks[name]),
+                    'mismatched_seasons': mismatched['year'].astype(int).tolist(),
+                })
+        return checks
+    if aggregated:
+        scheduler.add('standings_check', standings_check, inputs=list(AGGREGATES), outputs=['standings_check'])
+
+    def window_metric(name):
+        def run(fact, dim_races, years=None):
+            # 'fact' is the fact frame, or only marks that its processed output is written.
+            if stream_chunksize is None and not incremental:
+                df = build_window_metric(name, fact, dim_races)
+            else:
+                df = build_window_metric_from_processed(name, store, dim_races, years, chunksize=stream_chunksize or 100_000)
+            if metrics is not None:
+                metrics.record_table(name, df)
+            return df
+        return run
+
+    def write_window_metric(name):
+        def run(df, years=None):
+            store.write(name, df, years=years)
+        return run
+
+    # Incremental runs refresh the same seasons as the aggregates.
+    refreshed_years = ['aggregate_years'] if incremental else []
+    for name, fact in WINDOW_METRICS.items():
+        if name not in needed:
+            continue
+        if stream_chunksize is None and not incremental:
+            metric_inputs = [fact, 'dim_races']
+        else:
+            metric_inputs = [f"out:{fact}", 'dim_races'] + refreshed_years
+        scheduler.add(name, window_metric(name), inputs=metric_inputs, outputs=[name])
+        scheduler.add(f"write_{name}", write_window_metric(name), inputs=[name] + refreshed_years, outputs=[f"out:{name}"])
+        scheduler.add(f"validate_{name}", validate(name), inputs=[name] + validator.parents(name), outputs=[f"valid:{name}"])
+
+    if not load:
+        return scheduler
+
+    # Nothing is loaded until every table that exists as a whole frame passed
+    # validation. Streamed facts (and the aggregates built from them) are
+    # validated while the staging tables fill, before they are swapped in.
+    if stream_chunksize is None:
+        validated = [f"valid:{name}" for name in outputs]
     else:
-        print(f"\nNo null values found in table '{table_name}'.")
-        return False 
-def run_etl_pipeline():
+        validated = [f"valid:{name}" for name in DIMENSIONS]
+
+    if only is not None:
+        def load_tables(*frames):
+            db_loader.load_tables(dict(zip(outputs, frames)))
+        scheduler.add('load', load_tables, inputs=outputs + validated, outputs=['loaded'], resource='db')
+
+        def save_keys(_, *pit_stop_rows):
+            # Upserted dimensions may hold keys new to the registries. The race
+            # fingerprints stay, since only some tables were reloaded.
+            if pit_stop_rows:
+                state.record({}, [], processor.next_pit_stop_id + pit_stop_rows[0])
+            state.save()
+        pit_stop_rows = ['rows:fact_pit_stops'] if 'fact_pit_stops' in outputs else []
+        scheduler.add('save_state', save_keys, inputs=['loaded'] + pit_stop_rows)
+        return scheduler
+
+    if incremental:
+        tables = DIMENSIONS + FACTS
+        season_tables = list(AGGREGATES) + list(WINDOW_METRICS)
+        def load_incremental(*inputs):
+            frames = dict(zip(tables, inputs[:len(tables)]))
+            race_ids, *season_frames, years = inputs[len(tables):len(tables) + len(season_tables) + 2]
+            db_loader.load_incremental(
+                **frames, race_ids=race_ids,
+                aggregates=dict(zip(season_tables, season_frames)), years=years,
+            )
+        scheduler.add(
+            'load', load_incremental,
+            inputs=tables + ['race_ids'] + season_tables + ['aggregate_years'] + validated,
+            outputs=['loaded'], resource='db',
+        )
+    else:
+        scheduler.add('begin_load', lambda *_: db_loader.begin_load(), inputs=validated, outputs=['load:begin'], resource='db')
+        # File-based strategies ('load_data_infile') stream the CSV export when there is one.
+        csv_dir = store.processed_dir if 'csv' in store.formats else None
+        loaded_by_stage = DIMENSIONS + (FACTS if stream_chunksize is None else []) + list(AGGREGATES) + list(WINDOW_METRICS)
+        for name in loaded_by_stage:
+            def load_table(df, *_, name=name):
+                db_loader.load_table(name, df, csv_dir=csv_dir)
+            scheduler.add(
+                f"load_{name}", load_table,
+                inputs=[name, f"out:{name}", f"valid:{name}", 'load:begin'] + parent_loads(name),
+                outputs=[f"load:{name}"], resource='db',
+            )
+        scheduler.add(
+            'finish_load', lambda *_: db_loader.finish_load(),
+            inputs=[f"load:{name}" for name in outputs], outputs=['loaded'], resource='db',
+        )
+
+    def save_state(_, pit_stop_rows, fingerprints, pending_races):
+        # The watermark only moves once the load has committed.
+        next_pit_stop_id = processor.next_pit_stop_id + pit_stop_rows
+        state.record(fingerprints, pending_races, next_pit_stop_id)
+        state.save()
+    scheduler.add('save_state', save_state, inputs=['loaded', 'rows:fact_pit_stops', 'fingerprints', 'pending_races'])
+
+    return scheduler
+
+def run_etl_pipeline(incremental=False, streaming=False, profile=False, trace_memory=False, backend=None, export_csv=False, shard_workers=None, only=None, load=True):
     """
-    Main function to execute the F1 ETL pipeline step-by-step.
+    Main function to execute the F1 ETL pipeline as a DAG of stages.
+
+    Args:
+        incremental (bool): Only transform and load the races that are new or
+            changed since the last run, instead of dropping and reloading
+            the whole warehouse.
+        streaming (bool): Read, transform and load the fact tables in
+            bounded-memory chunks (full loads only).
+        profile (bool): Capture a cProfile of every stage (of the whole run on
+            Python 3.12+) next to the run report.
+        trace_memory (bool): Record per-stage memory deltas with tracemalloc.
+        backend (str, optional): Storage backend from database.BACKENDS,
+            'mysql' or the embedded 'sqlite'; database.DB_BACKEND by default.
+        export_csv (bool): Also write every processed table as CSV, next to
+            the Parquet output.
+        shard_workers (int, optional): Worker processes for the
+            season-sharded fact transforms; in-process when None.
+        only (list, optional): Rebuild just these tables (and the
+            dimensions they need) instead of the whole warehouse.
+        load (bool): Load the warehouse; without it the run only writes the
+            processed tables and never connects to the database.
+
+    Returns:
+        int: Exit status, 0 on success and 1 when a stage failed; the run
+        report is written either way.
     """
+    from et import F1ETQualifyProcessor
+    from incremental import EtlState
+    from output import ProcessedStore, default_formats
+    from rawcache import RawDataCache
+    from validation import DataValidator
+
     print("--- F1 Data ETL Pipeline Started ---")
     
     DATA_DIRECTORY = 'data/raw' 
 
     PROCESSED_DATA_DIRECTORY = 'data/processed'
-    
 
-    if not os.path.exists(PROCESSED_DATA_DIRECTORY):
-        os.makedirs(PROCESSED_DATA_DIRECTORY)
+    CACHE_DIRECTORY = 'data/cache'
+
+    STATE_PATH = 'data/state/etl_state.json'
+
+    # One of bulkload.STRATEGIES: 'to_sql', 'multi_row_insert', 'executemany',
+    # 'sqlite_bulk', 'load_data_infile'. None uses the backend's default.
+    LOAD_STRATEGY = None
+
+    # Worker threads for the stage scheduler.
+    MAX_WORKERS = 4
+
+    # Rows per chunk when streaming the fact tables.
+    STREAM_CHUNKSIZE = 100_000
+
+    # JSON run reports (and cProfile dumps) of every run.
+    REPORT_DIRECTORY = 'data/reports'
+
+    metrics = RunMetrics(
+        trace_memory=trace_memory,
+        profile_dir=os.path.join(REPORT_DIRECTORY, 'profiles') if profile else None,
+    )
+    metrics.count('mode', 'incremental' if incremental else 'streaming' if streaming else 'full')
+    backend = backend or DB_BACKEND
+    metrics.count('backend', backend)
+    metrics.count('shard_workers', shard_workers)
+    metrics.count('only', only)
+    metrics.count('load', load)
 
     try:
-        processor = F1ETQualifyProcessor(data_path=DATA_DIRECTORY)
-        
-        dim_drivers = processor.process_dim_drivers()
-        print("\n** Drivers Dimension **")
-        print(dim_drivers.head())
-        dim_drivers.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'dim_drivers.csv'), index=False)
-
-        dim_constructors = processor.process_dim_constructors()
-        print("\n** Constructors Dimension **")
-        print(dim_constructors.head())
-        dim_constructors.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'dim_constructors.csv'), index=False)
-        
-
-        dim_circuits = processor.process_dim_circuits()
-        print("\n** Circuits Dimension **")
-        print(dim_circuits.head())
-        dim_circuits.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'dim_circuits.csv'), index=False)
-
-        dim_races = processor.process_dim_races()
-        print("\n** Races Dimension **")
-        print(dim_races.head())
-        dim_races.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'dim_races.csv'), index=False)
-
-        dim_status = processor.process_dim_status()
-        print("\n** Status Dimension **")
-        print(dim_status.head())
-        dim_status.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'dim_status.csv'), index=False)
-
-        fact_qualifying = processor.process_fact_qualifying(        )
-        print("\n** Qualifying Fact Table (note the mapped FKs) **")
-        print(fact_qualifying.head())
-        fact_qualifying.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'fact_qualifying.csv'), index=False)
-
-        fact_pit_stops = processor.process_fact_pit_stops()
-        print("\n** Pit Stops Fact Table (note the mapped FKs) **")
-        print(fact_pit_stops.head())
-        fact_pit_stops.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'fact_pit_stops.csv'), index=False)
-
-
-        fact_race_results = processor.process_fact_race_results()
-        fact_race_results.to_csv(os.path.join(PROCESSED_DATA_DIRECTORY, 'fact_race_results.csv'), index=False) # <-- GUARDAR NUEVA TABLA DE HECHOS
-
-        db_loader = DatabaseLoader(engine=engine)
-        
-        db_loader.load_data(
-            dim_drivers=dim_drivers,
-            dim_constructors=dim_constructors,
-            dim_circuits=dim_circuits,
-            dim_races=dim_races,
-            dim_status=dim_status,
-            fact_qualifying=fact_qualifying,
-            fact_pit_stops=fact_pit_stops,
-            fact_race_results=fact_race_results
+        raw_cache = RawDataCache(CACHE_DIRECTORY)
+        state = EtlState(STATE_PATH)
+        processor = F1ETQualifyProcessor(
+            data_path=DATA_DIRECTORY, cache=raw_cache, registries=state.registries, metrics=metrics,
+            shard_workers=shard_workers,
         )
+        db_loader = None
+        if load:
+            from bulkload import STRATEGIES
+            from loader import DatabaseLoader
+
+            # The engine is only created once the first load stage runs.
+            strategy = STRATEGIES[LOAD_STRATEGY or BACKENDS[backend]['strategy']]()
+            db_loader = DatabaseLoader(strategy=strategy, use_staging=True, backend=backend)
+        validator = DataValidator()
+        store = ProcessedStore(PROCESSED_DATA_DIRECTORY, default_formats() + (['csv'] if export_csv else []))
+
+        pipeline = build_pipeline(
+            processor, state, db_loader, store, incremental, MAX_WORKERS,
+            stream_chunksize=STREAM_CHUNKSIZE if streaming else None, metrics=metrics, validator=validator,
+            only=only, load=load,
+        )
+        try:
+            pipeline.run()
+        finally:
+            processor.close()
+            pipeline.report()
+            validator.report()
+            for name, entry in validator.results.items():
+                metrics.record_nulls(name, entry['nulls'])
+            metrics.count('validation', {name: entry['violations'] for name, entry in validator.results.items()})
+        raw_cache.report()
+        processor.report_memory()
+        processor.report_unmapped_keys()
+        path, seconds = pipeline.critical_path()
+        metrics.count('critical_path', {'stages': path, 'seconds': round(seconds, 6)})
+        metrics.count('raw_cache', {'enabled': raw_cache.enabled, 'hits': raw_cache.hits, 'misses': raw_cache.misses})
+        metrics.count('unmapped_keys', {column: entry['rows'] for column, entry in processor.unmapped_keys.items()})
 
-        print("\n Verifying No Null Values in DataFrames ")
-        nulls_found = False  
-
-        if check_for_nulls(dim_drivers, 'dim_drivers'):
-            nulls_found = True
-        if check_for_nulls(dim_constructors, 'dim_constructors'):
-            nulls_found = True
-        if check_for_nulls(dim_circuits, 'dim_circuits'):
-            nulls_found = True
-        if check_for_nulls(dim_races, 'dim_races'):
-            nulls_found = True
-        if check_for_nulls(dim_status, 'dim_status'):
-            nulls_found = True
-        if check_for_nulls(fact_qualifying, 'fact_qualifying'):
-            nulls_found = True
-        if check_for_nulls(fact_pit_stops, 'fact_pit_stops'):
-            nulls_found = True
-        if check_for_nulls(fact_race_results, 'fact_race_results'):
-            nulls_found = True
-
-        if nulls_found:
-            print("\nWARNING: At least one table contains null values.  Review the output above for details.")
-        else:
-            print("\nAll tables passed the null value check.")
-        
-        
     except Exception as e:
         print(f"An error occurred during the ETL process: {e}")
-        
-    print("\n--- F1 Data ETL Pipeline Finished ---")
+        metrics.count('error', f"{type(e).__name__}: {e}")
+        status = 1
+    else:
+        status = 0
+
+    report_path = metrics.write_report(REPORT_DIRECTORY)
+    metrics.close()
+    print(f"\nRun report written to '{report_path}'.")
+    print(f"\n--- F1 Data ETL Pipeline {'Finished' if status == 0 else 'Failed'} ---")
+    return status
+
+def describe_run(incremental=False, streaming=False, only=None, load=True, data_path='data/raw'):
+    """
+    Prints what a run with these options would build, read and load,
+    without importing pandas or touching any file.
+    """
+    needed = required_tables(only)
+    outputs = output_tables(only)
+    fingerprinted = incremental or (load and only is None)
+
+    print("--- F1 Data ETL Pipeline Dry Run ---")
+    print(f"Mode: {'incremental' if incremental else 'streaming' if streaming else 'full'}")
+    print("\nTables to build:")
+    for name in needed:
+        print(f"  {name}{'' if name in outputs else '  (input only)'}")
+    print(f"\nRaw files to read from '{data_path}':")
+    for name in required_raw_inputs(needed, fingerprinted):
+        schema = RAW_SCHEMAS[name]
+        files = list(schema.get('snapshots', [schema['file']])) + ([schema['feeds']] if schema.get('feeds') else [])
+        print(f"  {name}: {', '.join(files)}")
+    if not load:
+        print("\nLoad: skipped; the watermark stays as it is.")
+    elif only is not None:
+        print("\nLoad: dimensions upserted, the other tables replaced; race fingerprints stay as they are.")
+    elif incremental:
+        print("\nLoad: new and changed races only, then the watermark moves.")
+    else:
+        print("\nLoad: every table, through staging tables swapped in at the end; then the watermark moves.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract, transform and load the F1 data into the warehouse.")
+    parser.add_argument('--incremental', action='store_true', help="only process the races that are new or changed since the last run")
+    parser.add_argument('--streaming', action='store_true', help="stream the fact tables in bounded-memory chunks (full loads only)")
+    parser.add_argument('--only', metavar='TABLE', action='append', choices=TABLES,
+                        help="rebuild just this table and the dimensions it needs; repeatable")
+    parser.add_argument('--no-load', dest='load', action='store_false', help="write the processed tables without loading the warehouse")
+    parser.add_argument('--dry-run', action='store_true', help="print the tables, raw files and load the run would use, then exit")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help=f"storage backend (default: {DB_BACKEND})")
+    parser.add_argument('--csv', dest='export_csv', action='store_true', help="also export every processed table as CSV")
+    parser.add_argument('--shard-workers', type=int, metavar='N', help="worker processes for the season-sharded fact transforms")
+    parser.add_argument('--profile', action='store_true', help="capture a cProfile of every stage (of the whole run on Python 3.12+)")
+    parser.add_argument('--trace-memory', action='store_true', help="record per-stage memory deltas with tracemalloc")
+    args = parser.parse_args(argv)
+    if args.incremental and args.streaming:
+        parser.error("--streaming only supports full loads")
+    if args.only and (args.incremental or args.streaming):
+        parser.error("--only cannot be combined with --incremental or --streaming")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.dry_run:
+        describe_run(args.incremental, args.streaming, args.only, args.load)
+        return 0
+    return run_etl_pipeline(
+        incremental=args.incremental,
+        streaming=args.streaming,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        backend=args.backend,
+        export_csv=args.export_csv,
+        shard_workers=args.shard_workers,
+        only=args.only,
+        load=args.load,
+    )
 
 if __name__ == "__main__":
-    run_etl_pipeline()
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
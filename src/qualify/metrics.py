@@ -0,0 +1,163 @@
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# From Python 3.12 cProfile hooks into the process-wide sys.monitoring, so
+# only one profiler can be enabled at a time, and it sees every thread.
+# Runs then record a single profile of the whole run. Before that a profiler
+# only sees the thread that enabled it; every stage gets its own profile,
+# and profiled stages take this lock so they run one at a time.
+WHOLE_RUN_PROFILE = sys.version_info >= (3, 12)
+_PROFILE_LOCK = threading.Lock()
+
+
+class RunMetrics:
+    """
+    Machine-readable record of one ETL run: wall time and memory delta of
+    every stage, input/output/dropped row counts per table, output dtypes,
+    null counts and free-form counters. Written as a JSON run report.
+
+    Memory deltas come from tracemalloc, which is process-wide: when stages
+    run concurrently, a stage's delta also includes what the stages running
+    alongside it allocated.
+
+    Profiled stages run one at a time, each into its own profile; on Python
+    3.12+ the run is profiled as a whole instead (see WHOLE_RUN_PROFILE).
+    """
+    def __init__(self, trace_memory=False, profile_dir=None):
+        """
+        Args:
+            trace_memory (bool): Record per-stage memory deltas and peaks with
+                tracemalloc (slows allocation-heavy stages down).
+            profile_dir (str, optional): Capture a cProfile of every stage
+                into '<profile_dir>/<stage>.prof', or of the whole run into
+                '<profile_dir>/run.prof' on Python 3.12+.
+        """
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.stages = {}
+        self.tables = {}
+        self.counters = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._run_profiler = None
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+            if WHOLE_RUN_PROFILE:
+                self._run_profiler = cProfile.Profile()
+                self._run_profiler.enable()
+
+    @property
+    def run_profile_path(self):
+        """Path of the whole-run profile, or None when stages are profiled one by one."""
+        return os.path.join(self.profile_dir, 'run.prof') if self._run_profiler is not None else None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the enclosed block as stage 'name', with its memory delta and optional profile."""
+        profiler = cProfile.Profile() if self.profile_dir is not None and self._run_profiler is None else None
+        if profiler is not None:
+            _PROFILE_LOCK.acquire()
+        memory_before = tracemalloc.get_traced_memory()[0] if self.trace_memory else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _PROFILE_LOCK.release()
+            end = time.perf_counter()
+            entry = {
+                'start': round(start - self._origin, 6),
+                'seconds': round(end - start, 6),
+            }
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                entry['memory_delta_bytes'] = current - memory_before
+                entry['traced_peak_bytes'] = peak
+            if profiler is not None:
+                path = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(path)
+                entry['profile'] = path
+            elif self._run_profiler is not None:
+                entry['profile'] = self.run_profile_path
+            with self._lock:
+                self.stages[name] = entry
+
+    def record_rows(self, table, rows_in, rows_out):
+        """Adds input and output row counts of a table; called once per frame or per chunk."""
+        with self._lock:
+            entry = self.tables.setdefault(table, {'rows_in': 0, 'rows_out': 0, 'rows_dropped': 0})
+            entry['rows_in'] += int(rows_in)
+            entry['rows_out'] += int(rows_out)
+            entry['rows_dropped'] += int(rows_in) - int(rows_out)
+
+    def record_table(self, table, df):
+        """Records the output columns and dtypes of a processed table."""
+        with self._lock:
+            entry = self.tables.setdefault(table, {'rows_in': 0, 'rows_out': 0, 'rows_dropped': 0})
+            entry['dtypes'] = {column: str(dtype) for column, dtype in df.dtypes.items()}
+
+    def record_memory(self, table, before, after):
+        """Adds the bytes of a processed table before and after dtype compaction."""
+        with self._lock:
+            entry = self.tables.setdefault(table, {'rows_in': 0, 'rows_out': 0, 'rows_dropped': 0})
+            entry['memory_bytes_before'] = entry.get('memory_bytes_before', 0) + int(before)
+            entry['memory_bytes_after'] = entry.get('memory_bytes_after', 0) + int(after)
+
+    def record_nulls(self, table, null_counts):
+        """Records the per-column null counts of a processed table (non-zero ones only)."""
+        with self._lock:
+            entry = self.tables.setdefault(table, {'rows_in': 0, 'rows_out': 0, 'rows_dropped': 0})
+            entry['nulls'] = {column: int(count) for column, count in null_counts.items() if count > 0}
+
+    def count(self, name, value):
+        """Sets a free-form counter, e.g. raw cache hits."""
+        with self._lock:
+            self.counters[name] = value
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(),
+            'seconds': round(time.perf_counter() - self._origin, 6),
+            'stages': self.stages,
+            'tables': self.tables,
+            'counters': self.counters,
+        }
+
+    def write_report(self, report_dir):
+        """
+        Writes the run report as 'run_<UTC timestamp>.json' into 'report_dir'.
+
+        Returns:
+            str: Path of the report.
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"run_{self.started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def close(self):
+        """Writes the whole-run profile, if any, and stops tracemalloc if this run started it."""
+        if self._run_profiler is not None:
+            self._run_profiler.disable()
+            self._run_profiler.dump_stats(self.run_profile_path)
+            self._run_profiler = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -80,9 +80,132 @@ class RaceResult(Base):
     fastest_lap_time_ms = Column(Integer)
     fastest_lap_speed = Column(Float)
 
+class DriverSeason(Base):
+    __tablename__ = 'agg_driver_season'
+    year = Column(Integer, primary_key=True)
+    driver_id = Column(Integer, ForeignKey('dim_drivers.driver_id'), primary_key=True)
+    points = Column(Float)
+    wins = Column(Integer)
+    podiums = Column(Integer)
+    entries = Column(Integer)
+    poles = Column(Integer)
+    avg_positions_gained = Column(Float)
+
+class ConstructorSeason(Base):
+    __tablename__ = 'agg_constructor_season'
+    year = Column(Integer, primary_key=True)
+    constructor_id = Column(Integer, ForeignKey('dim_constructors.constructor_id'), primary_key=True)
+    points = Column(Float)
+    wins = Column(Integer)
+    podiums = Column(Integer)
+    entries = Column(Integer)
+    poles = Column(Integer)
+    avg_positions_gained = Column(Float)
+
+class QualifyingMetrics(Base):
+    __tablename__ = 'metric_qualifying'
+    qualify_id = Column(Integer, primary_key=True)
+    year = Column(Integer)
+    race_id = Column(Integer, ForeignKey('dim_races.race_id'))
+    driver_id = Column(Integer, ForeignKey('dim_drivers.driver_id'))
+    best_time_ms = Column(Integer)
+    gap_to_pole_ms = Column(Integer)
+    teammate_delta_ms = Column(Integer)
+
+class PitStopMetrics(Base):
+    __tablename__ = 'metric_pit_stops'
+    pit_stop_id = Column(Integer, primary_key=True)
+    year = Column(Integer)
+    race_id = Column(Integer, ForeignKey('dim_races.race_id'))
+    driver_id = Column(Integer, ForeignKey('dim_drivers.driver_id'))
+    duration_rank = Column(Integer)
+
+class DriverPointsMetrics(Base):
+    __tablename__ = 'metric_driver_points'
+    result_id = Column(Integer, primary_key=True)
+    year = Column(Integer)
+    race_id = Column(Integer, ForeignKey('dim_races.race_id'))
+    driver_id = Column(Integer, ForeignKey('dim_drivers.driver_id'))
+    season_points = Column(Float)
+
 def create_all_tables(engine):
     print("Dropping all existing tables...")
     Base.metadata.drop_all(engine)
     print("Creating all tables...")
     Base.metadata.create_all(engine)
-    print("All tables created successfully.")
\ No newline at end of file
+    print("All tables created successfully.")
+
+def ensure_all_tables(engine):
+    """Creates the tables that do not exist yet, keeping existing data."""
+    print("Creating missing tables...")
+    Base.metadata.create_all(engine)
+
+# Secondary indexes on the common star-schema access paths, per table:
+# {index name: columns}. They are not declared on the models so that
+# create_all() builds bare tables; create_indexes() adds them once the bulk
+# load is done, instead of maintaining them row by row during the inserts.
+INDEXES = {
+    'dim_races': {
+        'ix_dim_races_year_round': ['year', 'round'],
+    },
+    'fact_qualifying': {
+        'ix_fact_qualifying_race_driver': ['race_id', 'driver_id'],
+        'ix_fact_qualifying_driver_race': ['driver_id', 'race_id'],
+    },
+    'fact_pit_stops': {
+        'ix_fact_pit_stops_race_driver': ['race_id', 'driver_id'],
+    },
+    'fact_race_results': {
+        'ix_fact_race_results_race_driver': ['race_id', 'driver_id'],
+        'ix_fact_race_results_driver_race': ['driver_id', 'race_id'],
+        'ix_fact_race_results_constructor_race': ['constructor_id', 'race_id'],
+    },
+    'metric_qualifying': {
+        'ix_metric_qualifying_race_driver': ['race_id', 'driver_id'],
+    },
+    'metric_pit_stops': {
+        'ix_metric_pit_stops_race_driver': ['race_id', 'driver_id'],
+    },
+    'metric_driver_points': {
+        'ix_metric_driver_points_driver_race': ['driver_id', 'race_id'],
+    },
+}
+
+def create_indexes(engine, indexes=None):
+    """Creates the secondary indexes that do not exist yet (INDEXES by default)."""
+    indexes = INDEXES if indexes is None else indexes
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for table_name, table_indexes in indexes.items():
+            if table_name not in tables:
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table_name)}
+            for index_name, columns in table_indexes.items():
+                if index_name in existing:
+                    continue
+                column_list = ', '.join(preparer.quote(c) for c in columns)
+                connection.execute(text(
+                    f"CREATE INDEX {preparer.quote(index_name)} ON {preparer.quote(table_name)} ({column_list})"
+                ))
+    print("Secondary indexes created.")
+
+def drop_indexes(engine, indexes=None):
+    """Drops the secondary indexes of INDEXES (or 'indexes') that exist."""
+    indexes = INDEXES if indexes is None else indexes
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for table_name, table_indexes in indexes.items():
+            if table_name not in tables:
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table_name)}
+            for index_name in table_indexes:
+                if index_name not in existing:
+                    continue
+                if engine.dialect.name == 'mysql':
+                    connection.execute(text(f"DROP INDEX {preparer.quote(index_name)} ON {preparer.quote(table_name)}"))
+                else:
+                    connection.execute(text(f"DROP INDEX {preparer.quote(index_name)}"))
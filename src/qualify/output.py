@@ -0,0 +1,286 @@
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+# Formats the processed tables can be written in. Parquet is the primary
+# output; CSV is an optional export.
+FORMATS = ['parquet', 'csv']
+
+# Tables written as one Parquet dataset per season, 'year=<season>/part-<n>.parquet'.
+PARTITIONED_TABLES = ['fact_qualifying', 'fact_pit_stops', 'fact_race_results']
+PARTITION_COLUMN = 'year'
+
+
+def parquet_available():
+    return pa is not None
+
+
+def default_formats():
+    """Parquet when pyarrow is installed, CSV otherwise, with a warning."""
+    if parquet_available():
+        return ['parquet']
+    print("WARNING: pyarrow is not installed: the processed tables are written as CSV, without the Parquet output. "
+          "Install the packages of requirements.txt to enable it.")
+    return ['csv']
+
+
+def arrow_schema(table):
+    """Returns the Arrow schema of a warehouse table, so every file of a table has the same types."""
+    from sqlalchemy import Date, Float, Integer
+
+    fields = []
+    for column in table.columns:
+        if isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _hidden(path, suffix):
+    # Dataset discovery skips names starting with '_', so unfinished
+    # partitions never show up in reads.
+    return os.path.join(os.path.dirname(path), f"_{os.path.basename(path)}{suffix}")
+
+
+def _replace_rows(existing, df, column, values):
+    """Drops the rows of 'existing' whose 'column' is in 'values' and appends 'df'."""
+    existing = existing[~existing[column].isin(values)]
+    return pd.concat([existing, df], ignore_index=True)
+
+
+class ProcessedStore:
+    """
+    Writes and reads the processed tables in 'processed_dir'.
+
+    In Parquet, dimensions and aggregates are single '<name>.parquet' files
+    and the fact tables are directories partitioned by season year (Hive
+    style), so readers can prune seasons and columns. Column types come from
+    the warehouse schema in models.py, which keeps dates as dates. The year
+    of a fact row is looked up from its race_id, since the fact tables have
+    no year column; reading one back restores it only when asked for.
+
+    Every write goes to all of 'formats'; CSV files keep their previous
+    layout, '<name>.csv'.
+    """
+    def __init__(self, processed_dir, formats=None, metadata=None):
+        """
+        Args:
+            processed_dir (str): Output directory.
+            formats (list, optional): Any of FORMATS; default_formats() by default.
+            metadata (MetaData, optional): Warehouse schema; models.Base.metadata by default.
+        """
+        formats = default_formats() if formats is None else list(formats)
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output format(s) {sorted(unknown)}; choose from {FORMATS}.")
+        if 'parquet' in formats and not parquet_available():
+            print("WARNING: pyarrow is not installed; writing the processed tables as CSV only.")
+            formats = [f for f in formats if f != 'parquet'] or ['csv']
+        if metadata is None:
+            from models import Base
+            metadata = Base.metadata
+        self.processed_dir = processed_dir
+        self.formats = formats
+        self.metadata = metadata
+        os.makedirs(processed_dir, exist_ok=True)
+
+    @property
+    def read_format(self):
+        """The format tables are read back from: Parquet whenever it is written."""
+        return 'parquet' if 'parquet' in self.formats else 'csv'
+
+    def csv_path(self, name):
+        return os.path.join(self.processed_dir, f"{name}.csv")
+
+    def parquet_path(self, name):
+        """'<name>' directory for partitioned tables, '<name>.parquet' otherwise."""
+        if name in PARTITIONED_TABLES:
+            return os.path.join(self.processed_dir, name)
+        return os.path.join(self.processed_dir, f"{name}.parquet")
+
+    def write(self, name, df, race_years=None, race_ids=None, years=None):
+        """
+        Writes a processed table in every format.
+
+        Args:
+            name (str): Warehouse table name.
+            df (pd.DataFrame): The processed frame.
+            race_years (pd.Series, optional): Season year by surrogate race_id;
+                required to partition the fact tables.
+            race_ids (list, optional): Only replace the rows of these races
+                (fact tables), keeping the rest of the existing output.
+            years (list, optional): Only replace the rows of these seasons
+                (aggregate tables), keeping the rest of the existing output.
+        """
+        if 'csv' in self.formats:
+            self._write_csv(name, df, race_ids, years)
+        if 'parquet' in self.formats:
+            if name in PARTITIONED_TABLES:
+                self._write_partitioned(name, df, race_years, race_ids)
+            else:
+                path = self.parquet_path(name)
+                if years is not None and os.path.exists(path):
+                    df = _replace_rows(self._read_file(path), df, 'year', years)
+                self._write_file(name, df, path)
+
+    def append(self, name, chunk, race_years=None, part=0):
+        """
+        Writes one chunk of a streamed table. Chunk 0 starts the table over;
+        Parquet chunks go to a staging directory that finish_stream() swaps in.
+        """
+        if 'csv' in self.formats:
+            chunk.to_csv(self.csv_path(name), index=False, mode='w' if part == 0 else 'a', header=part == 0)
+        if 'parquet' in self.formats:
+            staging = _hidden(self.parquet_path(name), '.tmp')
+            if part == 0:
+                shutil.rmtree(staging, ignore_errors=True)
+            self._write_partitions(name, chunk, self._years_of(chunk, race_years), staging, part)
+
+    def finish_stream(self, name):
+        """Makes the Parquet chunks written by append() the current output of 'name'."""
+        if 'parquet' in self.formats:
+            path = self.parquet_path(name)
+            staging = _hidden(path, '.tmp')
+            if not os.path.exists(staging):
+                os.makedirs(staging)
+            self._swap_in(staging, path)
+
+    def read(self, name, columns=None, years=None):
+        """
+        Reads a processed table back.
+
+        Args:
+            name (str): Warehouse table name.
+            columns (list, optional): Only these columns; for fact tables,
+                'year' adds the season partition as a column.
+            years (list, optional): Only these seasons; prunes the partitions
+                of fact tables.
+
+        Returns:
+            pd.DataFrame: The table.
+        """
+        return pd.concat(list(self.iter_chunks(name, columns, years)), ignore_index=True)
+
+    def iter_chunks(self, name, columns=None, years=None, chunksize=100_000):
+        """
+        Yields a processed table in chunks of at most 'chunksize' rows.
+        'years' prunes the partitions of Parquet fact tables; elsewhere the
+        caller filters the seasons it needs.
+        """
+        if self.read_format == 'csv':
+            reader = pd.read_csv(self.csv_path(name), usecols=columns, chunksize=chunksize)
+            with reader:
+                yield from reader
+            return
+        dataset = self._dataset(name)
+        if columns is None:
+            columns = [column.name for column in self.metadata.tables[name].columns]
+        expression = None
+        if years is not None and name in PARTITIONED_TABLES:
+            expression = ds.field(PARTITION_COLUMN).isin([int(y) for y in years])
+        empty = True
+        for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+            if batch.num_rows:
+                empty = False
+                yield batch.to_pandas(date_as_object=False)
+        if empty:
+            yield dataset.schema.empty_table().select(columns).to_pandas(date_as_object=False)
+
+    def _dataset(self, name):
+        path = self.parquet_path(name)
+        if name not in PARTITIONED_TABLES:
+            return ds.dataset(path, format='parquet')
+        partitioning = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.int64())]), flavor='hive')
+        schema = arrow_schema(self.metadata.tables[name]).append(pa.field(PARTITION_COLUMN, pa.int64()))
+        return ds.dataset(path, format='parquet', partitioning=partitioning, schema=schema)
+
+    def _write_csv(self, name, df, race_ids=None, years=None):
+        path = self.csv_path(name)
+        if os.path.exists(path) and (race_ids is not None or years is not None):
+            # Round-trip parsing keeps the kept rows' float text unchanged.
+            existing = pd.read_csv(path, float_precision='round_trip')
+            if race_ids is not None:
+                df = _replace_rows(existing, df, 'race_id', race_ids)
+            else:
+                df = _replace_rows(existing, df, 'year', years)
+        df.to_csv(path, index=False)
+
+    def _table(self, name, df):
+        schema = arrow_schema(self.metadata.tables[name])
+        df = df[[field.name for field in schema]]
+        dates = [field.name for field in schema if field.type == pa.date32() and not pd.api.types.is_datetime64_any_dtype(df[field.name])]
+        if dates:
+            # Unparseable dates become nulls, as they do in the loaded tables.
+            df = df.assign(**{column: pd.to_datetime(df[column], errors='coerce') for column in dates})
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    def _write_file(self, name, df, path):
+        tmp_path = _hidden(path, '.tmp')
+        pq.write_table(self._table(name, df), tmp_path)
+        os.replace(tmp_path, path)
+
+    def _read_file(self, path):
+        return pq.read_table(path).to_pandas(date_as_object=False)
+
+    def _years_of(self, df, race_years):
+        if race_years is None:
+            raise ValueError("Fact tables need the season year of every race_id to be partitioned.")
+        years = race_years.reindex(df['race_id'].to_numpy())
+        if years.isna().any():
+            missing = pd.unique(df['race_id'][years.isna().to_numpy()])[:5]
+            raise ValueError(f"No season year for race_id(s) {missing.tolist()}; cannot partition.")
+        return years.to_numpy(dtype='int64')
+
+    def _write_partitions(self, name, df, row_years, directory, part=0):
+        for year, rows in df.groupby(row_years, sort=True):
+            partition = os.path.join(directory, f"{PARTITION_COLUMN}={int(year)}")
+            os.makedirs(partition, exist_ok=True)
+            pq.write_table(self._table(name, rows), os.path.join(partition, f"part-{part}.parquet"))
+
+    def _swap_in(self, staging, path):
+        old = _hidden(path, '.old')
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old)
+        os.rename(staging, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def _write_partitioned(self, name, df, race_years, race_ids=None):
+        path = self.parquet_path(name)
+        row_years = self._years_of(df, race_years)
+        if race_ids is None or not os.path.exists(path):
+            staging = _hidden(path, '.tmp')
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            self._write_partitions(name, df, row_years, staging)
+            self._swap_in(staging, path)
+            return
+        # Only the seasons of the replaced races are rewritten.
+        affected = set(row_years.tolist()) | set(race_years.reindex(race_ids).dropna().astype(int).tolist())
+        for year in sorted(affected):
+            partition = os.path.join(path, f"{PARTITION_COLUMN}={year}")
+            rows = df[row_years == year]
+            files = sorted(os.listdir(partition)) if os.path.exists(partition) else []
+            if files:
+                existing = pd.concat([self._read_file(os.path.join(partition, f)) for f in files], ignore_index=True)
+                rows = _replace_rows(existing, rows, 'race_id', race_ids)
+            staging = _hidden(partition, '.tmp')
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            if len(rows):
+                pq.write_table(self._table(name, rows), os.path.join(staging, 'part-0.parquet'))
+            self._swap_in(staging, partition)
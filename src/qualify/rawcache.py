@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    feather = None
+
+# The missing-pyarrow warning is printed once per process, not per cache.
+_warned_disabled = False
+
+
+def _warn_disabled():
+    global _warned_disabled
+    if not _warned_disabled:
+        _warned_disabled = True
+        print("WARNING: pyarrow is not installed: the raw data cache is disabled and every raw file is parsed again. "
+              "Install the packages of requirements.txt to enable it.")
+
+
+class RawDataCache:
+    """
+    On-disk cache of parsed raw CSV files, stored as Arrow IPC (Feather)
+    files that are memory-mapped when read back.
+
+    Entries are keyed by the source file's size, mtime and SHA-256, plus a
+    hash of the schema used to parse it. A manifest keeps every known
+    fingerprint per source file; only the 'max_versions' most recently used
+    ones are kept on disk.
+    """
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, cache_dir, max_versions=2):
+        """
+        Args:
+            cache_dir (str): Directory for the cached frames and the manifest.
+            max_versions (int): Fingerprints kept per source file before the
+                least recently used ones are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_versions = max_versions
+        self.enabled = feather is not None
+        self.hits = 0
+        self.misses = 0
+        self.events = []
+        # Pipeline stages may load different files from several threads.
+        self._lock = threading.Lock()
+        if not self.enabled:
+            _warn_disabled()
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print("Raw data cache manifest is unreadable, starting empty.")
+            return {}
+
+    def _write_manifest(self):
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _content_hash(path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    @staticmethod
+    def _schema_hash(schema):
+        return hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def _find_entry(self, entries, size, mtime_ns, schema_hash, path):
+        """Returns the matching manifest entry, hashing the file only when its stat changed."""
+        candidates = [e for e in entries if e['size'] == size and e['schema'] == schema_hash]
+        for entry in candidates:
+            if entry['mtime_ns'] == mtime_ns:
+                return entry
+        if not candidates:
+            return None
+        # Same size but touched since cached: fall back to the content hash.
+        digest = self._content_hash(path)
+        for entry in candidates:
+            if entry['sha256'] == digest:
+                entry['mtime_ns'] = mtime_ns
+                return entry
+        return None
+
+    def load(self, path, schema, reader):
+        """
+        Returns the parsed frame for 'path', from the cache when its
+        fingerprint is known, otherwise by calling reader() and caching
+        the result.
+
+        Args:
+            path (str): Source CSV file.
+            schema (dict): Schema used to parse it; part of the cache key.
+            reader (callable): Zero-argument function that parses the CSV.
+        """
+        if not self.enabled:
+            return reader()
+
+        source = os.path.abspath(path)
+        stat = os.stat(source)
+        schema_hash = self._schema_hash(schema)
+
+        with self._lock:
+            entries = self._manifest.setdefault(source, [])
+            entry = self._find_entry(entries, stat.st_size, stat.st_mtime_ns, schema_hash, source)
+            if entry is not None:
+                cache_file = os.path.join(self.cache_dir, entry['file'])
+                if os.path.exists(cache_file):
+                    df = feather.read_feather(cache_file, memory_map=True)
+                    entry['last_used'] = time.time()
+                    self._write_manifest()
+                    self.hits += 1
+                    self.events.append((os.path.basename(path), 'hit'))
+                    return df
+                entries.remove(entry)
+
+        # Parsing happens outside the lock so several files can be read at once.
+        df = reader()
+        digest = self._content_hash(source)
+        cache_name = f"{os.path.splitext(os.path.basename(path))[0]}-{digest[:16]}-{schema_hash}.feather"
+        feather.write_feather(df, os.path.join(self.cache_dir, cache_name))
+
+        with self._lock:
+            entries = self._manifest.setdefault(source, [])
+            entries.append({
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': digest,
+                'schema': schema_hash,
+                'file': cache_name,
+                'last_used': time.time(),
+            })
+            self._evict(entries)
+            self._write_manifest()
+            self.misses += 1
+            self.events.append((os.path.basename(path), 'miss'))
+        return df
+
+    def _evict(self, entries):
+        """Keeps only the 'max_versions' most recently used entries of one source file."""
+        entries.sort(key=lambda e: e['last_used'], reverse=True)
+        for entry in entries[self.max_versions:]:
+            cache_file = os.path.join(self.cache_dir, entry['file'])
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+        del entries[self.max_versions:]
+
+    def report(self):
+        """Prints the cache hits and misses of this run."""
+        if not self.enabled:
+            return
+        print(f"\nRaw data cache: {self.hits} hit(s), {self.misses} miss(es).")
+        for file_name, outcome in self.events:
+            print(f"  {file_name}: {outcome}")
@@ -0,0 +1,161 @@
+import contextlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """
+    One step of the pipeline: a callable with named inputs and outputs.
+
+    The callable receives the values of 'inputs' as positional arguments and
+    returns the value of its single output, or a tuple with one value per
+    output. Stages that share a 'resource' (e.g. 'db') never run at the same
+    time.
+    """
+    def __init__(self, name, func, inputs=(), outputs=(), resource=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.resource = resource
+
+
+class StageScheduler:
+    """
+    Runs a DAG of stages on a thread pool. A stage starts as soon as every
+    stage producing one of its inputs has finished.
+    """
+    def __init__(self, max_workers=4, metrics=None):
+        """
+        Args:
+            max_workers (int): Stages that may run at the same time.
+            metrics (RunMetrics, optional): Receives the timing, memory delta
+                and profile of every stage.
+        """
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.stages = {}
+        self.producers = {}
+        self.timings = {}
+        self._resource_locks = {}
+
+    def add(self, name, func, inputs=(), outputs=(), resource=None):
+        """Declares a stage. Every output name may be produced by one stage only."""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        stage = Stage(name, func, inputs, outputs, resource)
+        for output in stage.outputs:
+            if output in self.producers:
+                raise ValueError(f"Output '{output}' is produced by both '{self.producers[output]}' and '{name}'.")
+            self.producers[output] = name
+        if resource is not None:
+            self._resource_locks.setdefault(resource, threading.Lock())
+        self.stages[name] = stage
+        return stage
+
+    def dependencies(self, name):
+        """Returns the names of the stages that 'name' waits for."""
+        stage = self.stages[name]
+        missing = [i for i in stage.inputs if i not in self.producers]
+        if missing:
+            raise ValueError(f"Stage '{name}' needs {missing}, which no stage produces.")
+        return {self.producers[i] for i in stage.inputs}
+
+    def _run_stage(self, stage, values, origin):
+        lock = self._resource_locks.get(stage.resource)
+        if lock is not None:
+            lock.acquire()
+        measured = self.metrics.stage(stage.name) if self.metrics is not None else contextlib.nullcontext()
+        try:
+            with measured:
+                start = time.perf_counter()
+                result = stage.func(*[values[i] for i in stage.inputs])
+                end = time.perf_counter()
+        finally:
+            if lock is not None:
+                lock.release()
+        self.timings[stage.name] = (start - origin, end - origin)
+        if len(stage.outputs) == 1:
+            result = (result,)
+        elif not stage.outputs:
+            result = ()
+        return dict(zip(stage.outputs, result))
+
+    def run(self):
+        """
+        Executes every stage and returns a dict with all produced outputs.
+        The first failing stage stops the scheduling of new stages and its
+        exception is re-raised once the running ones have finished.
+        """
+        waiting = {name: self.dependencies(name) for name in self.stages}
+        done = set()
+        values = {}
+        running = {}
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting or running:
+                for name in [n for n, deps in waiting.items() if deps <= done]:
+                    del waiting[name]
+                    running[pool.submit(self._run_stage, self.stages[name], values, origin)] = name
+                if not running:
+                    raise ValueError(f"Stages {sorted(waiting)} have circular dependencies.")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        wait(running)
+                        raise error
+                    values.update(future.result())
+                    done.add(name)
+        return values
+
+    def critical_path(self):
+        """Returns (stages, seconds) of the longest chain of dependent stage durations."""
+        finish = {}
+        previous = {}
+        for name in self._topological_order():
+            # After a failed run only the stages that finished have timings.
+            if name not in self.timings:
+                continue
+            duration = self.timings[name][1] - self.timings[name][0]
+            deps = self.dependencies(name) & finish.keys()
+            before = max(deps, key=lambda d: finish[d], default=None)
+            finish[name] = duration + (finish[before] if before else 0.0)
+            previous[name] = before
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
+
+    def _topological_order(self):
+        order = []
+        seen = set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in sorted(self.dependencies(name)):
+                visit(dep)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def report(self):
+        """Prints the wall-clock window of every stage and the critical path."""
+        print("\n** Stage Timings (seconds since start) **")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            print(f"  {name:<32} {start:8.3f} -> {end:8.3f}  ({end - start:.3f}s)")
+        path, total = self.critical_path()
+        print(f"Critical path ({total:.3f}s): {' -> '.join(path)}")
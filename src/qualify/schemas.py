@@ -0,0 +1,112 @@
+# Declared schemas of the raw Ergast CSV files.
+# Each entry lists the file name, the only columns the transforms use, an
+# explicit compact dtype per column and the markers to treat as missing.
+# Columns that are not listed (urls, car numbers, free-text times, ...) are
+# never parsed.
+
+NULL_MARKERS = ['\\N']
+
+RAW_SCHEMAS = {
+    'drivers': {
+        'file': 'drivers.csv',
+        'usecols': ['driverId', 'driverRef', 'forename', 'surname', 'dob', 'nationality'],
+        'dtype': {'driverId': 'int32', 'dob': 'str'},
+        'na_values': None,
+    },
+    'constructors': {
+        'file': 'constructors.csv',
+        'usecols': ['constructorId', 'constructorRef', 'name', 'nationality'],
+        'dtype': {'constructorId': 'int32'},
+        'na_values': None,
+    },
+    'circuits': {
+        'file': 'circuits.csv',
+        'usecols': ['circuitId', 'circuitRef', 'name', 'location', 'country'],
+        'dtype': {'circuitId': 'int32'},
+        'na_values': None,
+    },
+    'races': {
+        'file': 'races.csv',
+        # Overlapping snapshots of the races, merged on 'key' (see
+        # snapshots.merge_snapshots). Lowest precedence first: on conflicting
+        # rows races1.csv, the newest feed (it runs to 2024), wins; daily
+        # feed files matching 'feeds' override all of them in name order.
+        'snapshots': ['races.csv', 'races12.csv', 'races1.csv'],
+        'feeds': 'races_*.csv',
+        'key': ['raceId'],
+        # Data rows carry ten trailing '\N' fields that the header does not name.
+        'usecols': ['raceId', 'year', 'round', 'circuitId', 'name', 'date', 'time'],
+        'dtype': {'raceId': 'int32', 'year': 'int16', 'round': 'int8', 'circuitId': 'int32'},
+        # 'time' keeps its '\N' marker; process_dim_races replaces it with midnight.
+        'na_values': None,
+        'ragged': True,
+    },
+    'status': {
+        'file': 'status.csv',
+        'usecols': ['statusId', 'status'],
+        'dtype': {'statusId': 'int32'},
+        'na_values': NULL_MARKERS,
+    },
+    'qualifying': {
+        'file': 'qualifying.csv',
+        'usecols': ['qualifyId', 'raceId', 'driverId', 'constructorId', 'position', 'q1', 'q2', 'q3'],
+        'dtype': {
+            'qualifyId': 'int32', 'raceId': 'int32', 'driverId': 'int32',
+            'constructorId': 'int32', 'position': 'int8',
+            # Declared so chunked reads agree even when a chunk has only nulls.
+            'q1': 'str', 'q2': 'str', 'q3': 'str',
+        },
+        'na_values': NULL_MARKERS,
+    },
+    'pit_stops': {
+        'file': 'pit_stops.csv',
+        'usecols': ['raceId', 'driverId', 'stop', 'lap', 'milliseconds'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'stop': 'int8', 'lap': 'int16', 'milliseconds': 'int32'},
+        'na_values': NULL_MARKERS,
+    },
+    'results': {
+        'file': 'results.csv',
+        'usecols': [
+            'resultId', 'raceId', 'driverId', 'constructorId', 'grid', 'position',
+            'points', 'laps', 'milliseconds', 'fastestLap', 'rank',
+            'fastestLapTime', 'fastestLapSpeed', 'statusId',
+        ],
+        'dtype': {
+            'resultId': 'int32', 'raceId': 'int32', 'driverId': 'int32',
+            'constructorId': 'int32', 'grid': 'int16', 'position': 'Int16',
+            'points': 'float64', 'laps': 'int16', 'milliseconds': 'Int32',
+            'fastestLap': 'Int16', 'rank': 'Int16', 'fastestLapTime': 'str',
+            'fastestLapSpeed': 'float64', 'statusId': 'int32',
+        },
+        'na_values': NULL_MARKERS,
+    },
+    # Championship standings after every race; only used to check the season aggregates.
+    'driver_standings': {
+        'file': 'driver_standings.csv',
+        'usecols': ['raceId', 'driverId', 'points', 'wins'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'points': 'float64', 'wins': 'int16'},
+        'na_values': NULL_MARKERS,
+    },
+    'constructor_standings': {
+        'file': 'constructor_standings.csv',
+        'usecols': ['raceId', 'constructorId', 'points', 'wins'],
+        'dtype': {'raceId': 'int32', 'constructorId': 'int32', 'points': 'float64', 'wins': 'int16'},
+        'na_values': NULL_MARKERS,
+    },
+}
+
+# Raw inputs required by each process_* step of F1ETQualifyProcessor, and
+# by the race fingerprints of incremental.race_fingerprints().
+STAGE_INPUTS = {
+    'dim_drivers': ['drivers'],
+    'dim_constructors': ['constructors'],
+    'dim_circuits': ['circuits'],
+    'dim_races': ['races', 'circuits'],
+    'dim_status': ['status'],
+    'fact_qualifying': ['qualifying'],
+    'fact_pit_stops': ['pit_stops', 'results'],
+    'fact_race_results': ['results'],
+    'driver_standings': ['driver_standings', 'races'],
+    'constructor_standings': ['constructor_standings', 'races'],
+    'race_fingerprints': ['results', 'qualifying', 'pit_stops'],
+}
@@ -0,0 +1,128 @@
+import contextlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from keyregistry import KeyRegistry
+
+# Season shards per worker process: more shards than workers evens out the
+# load when a few modern seasons hold most of the rows.
+SHARDS_PER_WORKER = 4
+
+# Transform method of F1ETQualifyProcessor applied to every shard, per fact table.
+SHARD_TRANSFORMS = {
+    'fact_qualifying': '_transform_qualifying',
+    'fact_pit_stops': '_transform_pit_stops',
+    'fact_race_results': '_transform_race_results',
+}
+
+# Processor of the current worker process, built once by _init_worker.
+_worker = None
+
+
+def _init_worker(lookups):
+    """Builds the worker's processor around the key registries shipped with the pool."""
+    global _worker
+    from et import F1ETQualifyProcessor
+
+    registries = {name: KeyRegistry(name, lookup) for name, lookup in lookups.items()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker = F1ETQualifyProcessor(registries=registries, compact=False)
+
+
+def _transform_shard(table, raw):
+    """Runs the transform of 'table' over one shard; returns the rows and the unmapped keys."""
+    _worker.unmapped_keys = {}
+    transform = getattr(_worker, SHARD_TRANSFORMS[table])
+    if table == 'fact_pit_stops':
+        df = transform(raw, 1)
+    else:
+        df = transform(raw)
+    return df, _worker.unmapped_keys
+
+
+def season_shards(row_years, num_shards):
+    """
+    Splits rows into at most 'num_shards' groups of whole seasons with
+    similar row counts: seasons are taken largest first and each goes to
+    the lightest shard so far. The split only depends on the data.
+
+    Args:
+        row_years (np.ndarray): Season year of every row.
+        num_shards (int): Upper bound on the number of shards.
+
+    Returns:
+        list: Sorted row positions of every non-empty shard.
+    """
+    years, inverse, counts = np.unique(row_years, return_inverse=True, return_counts=True)
+    shard_of_year = np.zeros(len(years), dtype=np.int64)
+    loads = np.zeros(max(1, min(num_shards, len(years))), dtype=np.int64)
+    for year in np.lexsort((years, -counts)):
+        shard = int(np.argmin(loads))
+        shard_of_year[year] = shard
+        loads[shard] += counts[year]
+    shard_of_row = shard_of_year[inverse]
+    return [np.flatnonzero(shard_of_row == shard) for shard in range(len(loads)) if loads[shard]]
+
+
+class SeasonShardPool:
+    """
+    Process pool that runs the fact transforms of F1ETQualifyProcessor over
+    season shards. The dimension key registries are fixed before any fact
+    is transformed, so they are shipped once per worker, when it starts,
+    instead of with every task; tasks only carry their raw rows.
+
+    Workers are spawned rather than forked, since the pipeline calls in
+    from several threads.
+    """
+    def __init__(self, workers, registries):
+        """
+        Args:
+            workers (int): Worker processes.
+            registries (dict): KeyRegistry per dimension, shipped to every worker.
+        """
+        self.workers = workers
+        lookups = {name: registry.lookup for name, registry in registries.items()}
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(lookups,),
+        )
+
+    def run(self, table, raw, row_years):
+        """
+        Transforms the raw rows of a fact table shard by shard.
+
+        Args:
+            table (str): Fact table name, a key of SHARD_TRANSFORMS.
+            raw (pd.DataFrame): Raw rows, in file order; pit stops already
+                carry their constructorId.
+            row_years (np.ndarray): Season year of every raw row.
+
+        Returns:
+            tuple: (transformed rows in the order of 'raw', unmapped keys
+            per 'table.column' as recorded by the workers).
+        """
+        futures = []
+        for positions in season_shards(row_years, self.workers * SHARDS_PER_WORKER):
+            futures.append(self.executor.submit(_transform_shard, table, raw.iloc[positions]))
+
+        frames = []
+        unmapped = {}
+        for future in futures:
+            df, shard_unmapped = future.result()
+            frames.append(df)
+            for column, entry in shard_unmapped.items():
+                merged = unmapped.setdefault(column, {'rows': 0, 'keys': set()})
+                merged['rows'] += entry['rows']
+                merged['keys'].update(entry['keys'])
+        # Transforms keep the raw row labels, so sorting on them restores file order.
+        df = pd.concat(frames).sort_index(kind='stable')
+        return df, unmapped
+
+    def shutdown(self):
+        self.executor.shutdown()
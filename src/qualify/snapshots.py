@@ -0,0 +1,71 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def snapshot_files(data_path, schema):
+    """
+    Returns the snapshot files of a raw schema that exist in 'data_path',
+    lowest precedence first: the listed 'snapshots' in order, then the files
+    matching the 'feeds' pattern in name order. Without 'snapshots' this is
+    just the schema's 'file'.
+    """
+    names = list(schema.get('snapshots', [schema['file']]))
+    if schema.get('feeds'):
+        feeds = sorted(os.path.basename(p) for p in glob.glob(os.path.join(data_path, schema['feeds'])))
+        names += [n for n in feeds if n not in names]
+    paths = [os.path.join(data_path, n) for n in names if os.path.exists(os.path.join(data_path, n))]
+    if not paths:
+        raise FileNotFoundError(f"None of the snapshot files {names} exist in '{data_path}'.")
+    return paths
+
+
+def merge_snapshots(frames, key):
+    """
+    Merges overlapping snapshots of one entity into a single frame with one
+    row per natural key.
+
+    Rows repeated verbatim across snapshots are dropped by comparing one
+    64-bit hash per row. Rows that share a key but differ are conflicts: the
+    row of the later (higher precedence) snapshot wins, and within one
+    snapshot the first row of a key wins. Rows are ordered by where their
+    key first appears, scanning the snapshots in order.
+
+    Args:
+        frames (list): Parsed snapshots with the same columns, lowest precedence first.
+        key (list): Natural key columns.
+
+    Returns:
+        tuple: (merged frame, stats dict with the rows read,
+        exact duplicates dropped, conflicting keys and rows kept).
+    """
+    columns = list(frames[0].columns)
+    combined = pd.concat([frame[columns] for frame in frames], ignore_index=True)
+    rank = np.concatenate([np.full(len(frame), i, dtype=np.int32) for i, frame in enumerate(frames)])
+    row_hashes = pd.util.hash_pandas_object(combined, index=False).to_numpy()
+    key_hashes = pd.util.hash_pandas_object(combined[key], index=False).to_numpy()
+    first_position = pd.Series(np.arange(len(combined))).groupby(key_hashes).transform('min').to_numpy()
+
+    # Keep one copy of every distinct row, from the highest-precedence snapshot holding it.
+    order = np.lexsort((np.arange(len(combined)), -rank))
+    combined, row_hashes = combined.iloc[order], row_hashes[order]
+    duplicate = pd.Series(row_hashes).duplicated().to_numpy()
+    combined = combined[~duplicate]
+
+    # What is left with a repeated key differs from the winning row.
+    repeated = combined.duplicated(subset=key).to_numpy()
+    conflicting_keys = combined.loc[repeated, key].drop_duplicates()
+    winners = combined[~repeated]
+    # Known keys keep their order and new ones come after them, so surrogate
+    # ids assigned in order of appearance do not shift.
+    merged = winners.iloc[np.argsort(first_position[winners.index.to_numpy()], kind='stable')].reset_index(drop=True)
+
+    stats = {
+        'rows_read': int(sum(len(frame) for frame in frames)),
+        'exact_duplicates': int(duplicate.sum()),
+        'conflicting_keys': int(len(conflicting_keys)),
+        'rows_out': int(len(merged)),
+    }
+    return merged, stats
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# Character codes used by the parser.
+_ZERO, _NINE = ord('0'), ord('9')
+_COLON, _DOT = ord(':'), ord('.')
+_PLUS, _SPACE = ord('+'), ord(' ')
+# Decorations of gap strings ('+5.478', '+ 9.9', '+12.345s', '+9.999 sec'):
+# a leading '+' and one space after it, then a trailing unit, 's' or
+# 'sec', optionally after one space. The unit is read letter by letter.
+_UNIT = [ord(c) for c in 'sec']
+# Digits allowed in an hours, minutes or seconds field, and ':' separators
+# allowed in a time ('H:MM:SS'), so no value can overflow int64.
+_FIELD_WIDTH = 3
+_MAX_COLONS = 2
+
+
+def _as_code_matrix(values):
+    """
+    Converts a column of strings into a 2-D array of character codes,
+    one row per value, right-padded with zeros.
+    """
+    s = pd.Series(values, copy=False)
+    text = s.where(s.notna(), '').to_numpy().astype(str)
+    width = max(text.dtype.itemsize // 4, 1)
+    return np.ascontiguousarray(text).view(np.uint32).reshape(len(text), width)
+
+
+def to_milliseconds(values):
+    """
+    Converts a column of time strings to integer milliseconds in one pass.
+
+    Handles 'M:SS.mmm' (lap times), 'H:MM:SS.mmm' (results.time of the winner)
+    and gap strings such as '+5.478', '+ 1:02.5' or '+9.999 sec'. Missing
+    values, '\\N' and anything unparseable, including decorations anywhere
+    else (e.g. '1e5'), empty fields ('1:', '5.') and fields wider than
+    _FIELD_WIDTH digits, become <NA>. Fractions are truncated to milliseconds.
+
+    The work is done column-by-column over a character matrix, so the cost
+    grows with the string width, not with per-row Python calls.
+
+    Args:
+        values (pd.Series): Column of time strings.
+
+    Returns:
+        pd.Series: Nullable 'Int64' series aligned with the input index.
+    """
+    s = pd.Series(values, copy=False)
+    codes = _as_code_matrix(s)
+    n_rows = codes.shape[0]
+
+    seconds = np.zeros(n_rows, dtype=np.int64)   # completed H/M fields, in seconds
+    field = np.zeros(n_rows, dtype=np.int64)     # field currently being read
+    field_digits = np.zeros(n_rows, dtype=np.int64)
+    colons = np.zeros(n_rows, dtype=np.int64)
+    previous_digit = np.zeros(n_rows, dtype=bool)
+    after_separator = np.zeros(n_rows, dtype=bool)  # a ':' or '.' still waits for its digit
+    fraction = np.zeros(n_rows, dtype=np.int64)
+    fraction_digits = np.zeros(n_rows, dtype=np.int64)
+    in_fraction = np.zeros(n_rows, dtype=bool)
+    has_digit = np.zeros(n_rows, dtype=bool)
+    valid = np.ones(n_rows, dtype=bool)
+    # 0 before the time, 1 within it, 2 in the trailing unit.
+    part = np.zeros(n_rows, dtype=np.int8)
+    signed = np.zeros(n_rows, dtype=bool)        # a leading '+' was read
+    after_plus = np.zeros(n_rows, dtype=bool)    # the previous character was it
+    unit_letters = np.zeros(n_rows, dtype=np.int64)
+
+    for col in codes.T:
+        is_digit = (col >= _ZERO) & (col <= _NINE)
+        is_colon = col == _COLON
+        is_dot = col == _DOT
+        is_plus = col == _PLUS
+        is_space = col == _SPACE
+        digit = col.astype(np.int64) - _ZERO
+
+        is_unit = np.zeros(n_rows, dtype=bool)
+        for position, letter in enumerate(_UNIT):
+            is_unit |= (col == letter) & (unit_letters == position) & has_digit
+        # Padding (0) follows the end of every shorter string.
+        valid &= (
+            (col == 0) | is_unit
+            | ((is_digit | is_colon | is_dot) & (part < 2))
+            | (is_plus & (part == 0) & ~signed)
+            | (is_space & after_plus)
+            | (is_space & (part == 1) & has_digit)
+        )
+        signed |= is_plus
+        after_plus = is_plus
+        part = np.where(is_digit | is_colon | is_dot, np.maximum(part, 1), part)
+        part = np.where(is_unit | (is_space & (part == 1)), 2, part)
+        unit_letters += is_unit
+
+        # Every ':' or '.' sits between two digits.
+        is_separator = is_colon | is_dot
+        valid &= ~(is_separator & ~previous_digit)
+        valid &= ~(after_separator & ~is_digit)
+        after_separator = is_separator
+        previous_digit = is_digit
+
+        whole_digit = is_digit & ~in_fraction
+        valid &= ~(whole_digit & (field_digits >= _FIELD_WIDTH))
+        field = np.where(whole_digit, field * 10 + digit, field)
+        field_digits += whole_digit
+
+        frac_digit = is_digit & in_fraction & (fraction_digits < 3)
+        fraction = np.where(frac_digit, fraction * 10 + digit, fraction)
+        fraction_digits += frac_digit
+
+        valid &= ~(is_colon & (colons >= _MAX_COLONS))
+        colons += is_colon
+        seconds = np.where(is_colon, (seconds + field) * 60, seconds)
+        field = np.where(is_colon, 0, field)
+        field_digits = np.where(is_colon, 0, field_digits)
+
+        valid &= ~((is_colon | is_dot) & in_fraction)
+        in_fraction |= is_dot
+        has_digit |= is_digit
+
+    # A unit is 's' or 'sec', never 'se', and a space must be followed by one.
+    valid &= (part < 2) | (unit_letters == 1) | (unit_letters == 3)
+    valid &= ~after_separator
+    fraction *= 10 ** (3 - fraction_digits)
+    total_ms = (seconds + field) * 1000 + fraction
+
+    result = pd.array(total_ms, dtype='Int64')
+    result[~(valid & has_digit)] = pd.NA
+    return pd.Series(result, index=s.index, name=s.name)
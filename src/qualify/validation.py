@@ -0,0 +1,220 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Inclusive (min, max) bounds per table and column; None leaves that side open.
+# Results use 0 for "not classified" positions and for missing lap data.
+VALUE_RANGES = {
+    'dim_races': {'year': (1950, None), 'round': (1, None)},
+    'fact_qualifying': {
+        'position': (1, None),
+        'q1_time_ms': (0, None),
+        'q2_time_ms': (0, None),
+        'q3_time_ms': (0, None),
+    },
+    'fact_pit_stops': {'lap': (1, None), 'stop_number': (1, None), 'duration_ms': (0, None)},
+    'fact_race_results': {
+        'position': (0, None),
+        'grid': (0, None),
+        'points': (0, None),
+        'laps': (0, None),
+        'milliseconds': (0, None),
+        'fastest_lap': (0, None),
+        'rank': (0, None),
+        'fastest_lap_time_ms': (0, None),
+        'fastest_lap_speed': (0, None),
+    },
+    'agg_driver_season': {'points': (0, None), 'wins': (0, None), 'podiums': (0, None), 'entries': (0, None), 'poles': (0, None)},
+    'agg_constructor_season': {'points': (0, None), 'wins': (0, None), 'podiums': (0, None), 'entries': (0, None), 'poles': (0, None)},
+    # Gaps compare one shared session, so a driver can beat the pole sitter's Q1 time.
+    'metric_qualifying': {'best_time_ms': (1, None)},
+    'metric_pit_stops': {'duration_rank': (1, None)},
+    'metric_driver_points': {'season_points': (0, None)},
+}
+
+# Columns allowed to hold nulls; every other column must be fully populated.
+# Qualifying metrics are null for drivers (or teammates) without a time.
+NULLABLE_COLUMNS = {
+    'metric_qualifying': ['best_time_ms', 'gap_to_pole_ms', 'teammate_delta_ms'],
+}
+
+# Largest key for which foreign-key membership uses a dense lookup array
+# instead of a sort-based np.isin.
+DENSE_LOOKUP_LIMIT = 50_000_000
+
+
+class ValidationError(Exception):
+    """Raised by DataValidator.validate when a table breaks at least one rule."""
+    def __init__(self, table, violations):
+        self.table = table
+        self.violations = violations
+        rules = ', '.join(f"{v['rule']}({v['column']}): {v['rows']}" for v in violations)
+        super().__init__(f"Table '{table}' failed validation: {rules}")
+
+
+def _membership(values, parent_keys):
+    """Returns a boolean mask of the 'values' that appear in 'parent_keys'."""
+    if (
+        np.issubdtype(values.dtype, np.integer) and np.issubdtype(parent_keys.dtype, np.integer)
+        and len(parent_keys) and parent_keys.min() >= 0 and parent_keys.max() < DENSE_LOOKUP_LIMIT
+    ):
+        # Surrogate keys are small dense integers: one boolean take per row.
+        present = np.zeros(int(parent_keys.max()) + 1, dtype=bool)
+        present[parent_keys] = True
+        in_range = (values >= 0) & (values < len(present))
+        found = np.zeros(len(values), dtype=bool)
+        found[in_range] = present[values[in_range]]
+        return found
+    return np.isin(values, parent_keys)
+
+
+def _in_sorted(sorted_keys, values):
+    """Returns a boolean mask of the 'values' that appear in the sorted array 'sorted_keys'."""
+    if not len(sorted_keys):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, values), len(sorted_keys) - 1)
+    return sorted_keys[positions] == values
+
+
+class DataValidator:
+    """
+    Checks processed tables before they are loaded, in one vectorized pass
+    per table. The rules come from the warehouse schema in models.py plus
+    VALUE_RANGES and NULLABLE_COLUMNS:
+
+    - not_null: no nulls outside the declared nullable columns.
+    - primary_key: primary keys are unique, also across streamed chunks.
+    - foreign_key: every foreign key exists in the parent table's frame.
+    - range: values lie within the declared bounds.
+    """
+    def __init__(self, metadata=None, value_ranges=None, nullable_columns=None, sample_size=5):
+        """
+        Args:
+            metadata (MetaData, optional): Warehouse schema; models.Base.metadata by default.
+            value_ranges (dict, optional): Bounds per table and column; VALUE_RANGES by default.
+            nullable_columns (dict, optional): Nullable columns per table; NULLABLE_COLUMNS by default.
+            sample_size (int): Offending values kept per violated rule.
+        """
+        if metadata is None:
+            from models import Base
+            metadata = Base.metadata
+        self.metadata = metadata
+        self.value_ranges = VALUE_RANGES if value_ranges is None else value_ranges
+        self.nullable_columns = NULLABLE_COLUMNS if nullable_columns is None else nullable_columns
+        self.sample_size = sample_size
+        # Per table: rows and rules checked, violations found, null counts.
+        self.results = {}
+        self._seen_keys = {}
+        self._lock = threading.Lock()
+
+    def parents(self, name):
+        """Returns the tables that the foreign keys of 'name' reference."""
+        return sorted({fk.column.table.name for fk in self.metadata.tables[name].foreign_keys})
+
+    def _violation(self, name, rule, column, mask, values):
+        rows = int(mask.sum())
+        sample = pd.unique(values[mask])[:self.sample_size]
+        return {'table': name, 'rule': rule, 'column': column, 'rows': rows, 'sample': [str(v) for v in sample]}
+
+    def check(self, name, df, parents=None):
+        """
+        Applies every rule of table 'name' to 'df' and records the outcome.
+
+        Args:
+            name (str): Warehouse table name.
+            df (pd.DataFrame): The processed frame, or one chunk of it.
+            parents (dict, optional): Frames of the referenced tables, keyed by
+                name; foreign keys to tables missing here are not checked.
+
+        Returns:
+            list: One dict per violated rule (table, rule, column, rows, sample).
+        """
+        table = self.metadata.tables[name]
+        parents = parents or {}
+        violations = []
+        rules = 0
+
+        null_counts = df.isna().sum()
+        nullable = set(self.nullable_columns.get(name, []))
+        for column in table.columns:
+            if column.name in df.columns and column.name not in nullable:
+                rules += 1
+                if null_counts[column.name]:
+                    mask = df[column.name].isna().to_numpy()
+                    violations.append(self._violation(name, 'not_null', column.name, mask, df[column.name].to_numpy()))
+
+        key_columns = [column.name for column in table.primary_key.columns]
+        if key_columns:
+            rules += 1
+            if len(key_columns) == 1:
+                keys = df[key_columns[0]].to_numpy()
+            else:
+                # Composite keys are compared through one 64-bit hash per row.
+                keys = pd.util.hash_pandas_object(df[key_columns], index=False).to_numpy()
+            mask = pd.Series(keys).duplicated(keep=False).to_numpy()
+            with self._lock:
+                # Sorted unique keys of the earlier chunks: each chunk is probed
+                # with one searchsorted and merged in with one insert.
+                seen = self._seen_keys.get(name, keys[:0])
+                known = _in_sorted(seen, keys)
+                new = np.unique(keys[~known])
+                self._seen_keys[name] = np.insert(seen, np.searchsorted(seen, new), new)
+            mask |= known
+            if mask.any():
+                values = df[key_columns[0]].to_numpy() if len(key_columns) == 1 else df[key_columns].astype(str).agg('/'.join, axis=1).to_numpy()
+                violations.append(self._violation(name, 'primary_key', '/'.join(key_columns), mask, values))
+
+        for column in table.columns:
+            for fk in column.foreign_keys:
+                parent = parents.get(fk.column.table.name)
+                if parent is None:
+                    continue
+                rules += 1
+                values = df[column.name]
+                present = values.notna().to_numpy()
+                child_keys = values.to_numpy()
+                mask = np.zeros(len(values), dtype=bool)
+                if present.all():
+                    mask = ~_membership(child_keys, parent[fk.column.name].to_numpy())
+                elif present.any():
+                    mask[present] = ~np.isin(child_keys[present], parent[fk.column.name].to_numpy())
+                if mask.any():
+                    violations.append(self._violation(name, 'foreign_key', column.name, mask, child_keys))
+
+        for column, (low, high) in self.value_ranges.get(name, {}).items():
+            if column not in df.columns:
+                continue
+            rules += 1
+            values = df[column]
+            mask = pd.Series(False, index=values.index)
+            if low is not None:
+                mask |= values < low
+            if high is not None:
+                mask |= values > high
+            # Nulls are the not_null rule's business, never a range violation.
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+            if mask.any():
+                violations.append(self._violation(name, 'range', column, mask, values.to_numpy()))
+
+        with self._lock:
+            entry = self.results.setdefault(name, {'rows': 0, 'rules': rules, 'violations': [], 'nulls': None})
+            entry['rows'] += len(df)
+            entry['violations'].extend(violations)
+            entry['nulls'] = null_counts if entry['nulls'] is None else entry['nulls'] + null_counts
+        return violations
+
+    def validate(self, name, df, parents=None):
+        """Runs check() and raises ValidationError on the first table that breaks a rule."""
+        violations = self.check(name, df, parents)
+        if violations:
+            raise ValidationError(name, violations)
+
+    def report(self):
+        """Prints one line per validated table and every violated rule."""
+        print("\n** Data Validation **")
+        for name, entry in self.results.items():
+            status = 'OK' if not entry['violations'] else f"{len(entry['violations'])} violation(s)"
+            print(f"  {name:<24} {entry['rows']:>9} rows  {entry['rules']:>3} rules  {status}")
+            for v in entry['violations']:
+                print(f"    {v['rule']:<12} {v['column']:<22} {v['rows']} row(s), e.g. {', '.join(v['sample'])}")
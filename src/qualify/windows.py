@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+# Window metric tables and the fact table each one is computed from. Every
+# metric is a grouped window over the rows of one race or one season, so
+# incremental runs rebuild the seasons of the reprocessed races, like the
+# season aggregates.
+WINDOW_METRICS = {
+    'metric_qualifying': 'fact_qualifying',
+    'metric_pit_stops': 'fact_pit_stops',
+    'metric_driver_points': 'fact_race_results',
+}
+
+# Fact columns each window metric reads; refreshes read only these back.
+WINDOW_INPUTS = {
+    'metric_qualifying': ['qualify_id', 'race_id', 'driver_id', 'constructor_id', 'position', 'q1_time_ms', 'q2_time_ms', 'q3_time_ms'],
+    'metric_pit_stops': ['pit_stop_id', 'race_id', 'driver_id', 'duration_ms'],
+    'metric_driver_points': ['result_id', 'race_id', 'driver_id', 'points'],
+}
+
+
+def _calendar(fact, dim_races):
+    """Returns the season year and round of every row of 'fact', looked up by race_id."""
+    calendar = dim_races.set_index('race_id')[['year', 'round']].reindex(fact['race_id'].to_numpy())
+    return calendar['year'].to_numpy(), calendar['round'].to_numpy()
+
+
+def _by_id(df, columns):
+    """
+    Returns 'columns' of 'df' sorted by its first column, the fact id, so a
+    metric comes out in the same order however its fact rows were read.
+    """
+    return df.sort_values(columns[0], kind='stable', ignore_index=True)[columns]
+
+
+def _milliseconds(values):
+    return values.round().astype('Int64')
+
+
+def _session_delta(times, other):
+    """
+    Returns times - other, row by row, in the last session (Q3, then Q2,
+    then Q1) in which both drivers set a time; NaN when they share none.
+    Both arguments are (rows, 3) arrays of session times with NaN for a
+    missing time.
+    """
+    shared = ~np.isnan(times) & ~np.isnan(other)
+    last = 2 - np.argmax(shared[:, ::-1], axis=1)
+    rows = np.arange(len(times))
+    return np.where(shared.any(axis=1), times[rows, last] - other[rows, last], np.nan)
+
+
+def qualifying_metrics(qualifying, dim_races):
+    """
+    Computes the qualifying window metrics of every driver in every race:
+    their best session time, its gap to the pole sitter (the driver
+    qualified first) and to their fastest teammate (the best-qualified
+    other driver of their team).
+
+    Knockout sessions are run on different track conditions, so both gaps
+    compare the two drivers' times in the last session they both set a
+    time in, never a Q1 time against a Q3 time. Rows are sorted once by
+    race, constructor and position; the teammate of a team's best-qualified
+    driver is then the next row, and everyone else's is the team's first
+    row. Missing times (0 in the fact table) leave the metrics null, as
+    does a teammate or pole sitter without a shared session.
+
+    Args:
+        qualifying (pd.DataFrame): fact_qualifying rows.
+        dim_races (pd.DataFrame): The races dimension.
+
+    Returns:
+        pd.DataFrame: metric_qualifying rows, sorted by qualify_id.
+    """
+    year, _ = _calendar(qualifying, dim_races)
+    df = pd.DataFrame({
+        'qualify_id': qualifying['qualify_id'].to_numpy(),
+        'year': year,
+        'race_id': qualifying['race_id'].to_numpy(),
+        'driver_id': qualifying['driver_id'].to_numpy(),
+        'constructor_id': qualifying['constructor_id'].to_numpy(),
+        'position': qualifying['position'].to_numpy(dtype=np.float64),
+    })
+    df = df.sort_values(['race_id', 'constructor_id', 'position'], kind='stable', na_position='last')
+    times = qualifying[['q1_time_ms', 'q2_time_ms', 'q3_time_ms']].to_numpy(dtype=np.float64)[df.index.to_numpy()]
+    times[~(times > 0)] = np.nan
+    rows = np.arange(len(df))
+
+    # The pole row of every race, spread over the rows of that race.
+    on_pole = df['position'].to_numpy() == 1
+    poles = pd.Series(rows[on_pole], index=df['race_id'].to_numpy()[on_pole])
+    pole = poles[~poles.index.duplicated()].reindex(df['race_id'].to_numpy()).to_numpy()
+    pole_times = np.full_like(times, np.nan)
+    has_pole = ~np.isnan(pole)
+    pole_times[has_pole] = times[pole[has_pole].astype(np.int64)]
+
+    team = df.groupby(['race_id', 'constructor_id'], sort=False)
+    team_rank = team.cumcount().to_numpy()
+    team_size = team['race_id'].transform('size').to_numpy()
+    first = rows - team_rank
+    teammate = np.where(team_rank == 0, first + 1, first)
+    teammate_times = np.full_like(times, np.nan)
+    has_teammate = team_size > 1
+    teammate_times[has_teammate] = times[teammate[has_teammate]]
+
+    # fmin skips NaN, so a driver's best time ignores the sessions they missed.
+    best = np.fmin.reduce(times, axis=1) if len(times) else np.empty(0)
+    df['best_time_ms'] = _milliseconds(pd.Series(best, index=df.index))
+    df['gap_to_pole_ms'] = _milliseconds(pd.Series(_session_delta(times, pole_times), index=df.index))
+    df['teammate_delta_ms'] = _milliseconds(pd.Series(_session_delta(times, teammate_times), index=df.index))
+    return _by_id(df, ['qualify_id', 'year', 'race_id', 'driver_id', 'best_time_ms', 'gap_to_pole_ms', 'teammate_delta_ms'])
+
+
+def pit_stop_metrics(pit_stops, dim_races):
+    """
+    Ranks every pit stop by duration within its race, 1 being the fastest
+    stop; tied stops share the best rank.
+
+    Args:
+        pit_stops (pd.DataFrame): fact_pit_stops rows.
+        dim_races (pd.DataFrame): The races dimension.
+
+    Returns:
+        pd.DataFrame: metric_pit_stops rows, sorted by pit_stop_id.
+    """
+    year, _ = _calendar(pit_stops, dim_races)
+    df = pd.DataFrame({
+        'pit_stop_id': pit_stops['pit_stop_id'].to_numpy(),
+        'year': year,
+        'race_id': pit_stops['race_id'].to_numpy(),
+        'driver_id': pit_stops['driver_id'].to_numpy(),
+        'duration_ms': pit_stops['duration_ms'].to_numpy(dtype=np.float64),
+    })
+    df['duration_rank'] = df.groupby('race_id', sort=False)['duration_ms'].rank(method='min').astype(np.int64)
+    return _by_id(df, ['pit_stop_id', 'year', 'race_id', 'driver_id', 'duration_rank'])
+
+
+def driver_points_metrics(race_results, dim_races):
+    """
+    Computes the cumulative season points of every driver after every race,
+    from one pass over the results sorted by season, driver and round.
+    Drivers who shared cars have several results in a race; every one of
+    them gets the total after that race.
+
+    Args:
+        race_results (pd.DataFrame): fact_race_results rows.
+        dim_races (pd.DataFrame): The races dimension.
+
+    Returns:
+        pd.DataFrame: metric_driver_points rows, sorted by result_id.
+    """
+    year, round_ = _calendar(race_results, dim_races)
+    df = pd.DataFrame({
+        'result_id': race_results['result_id'].to_numpy(),
+        'year': year,
+        'round': round_,
+        'race_id': race_results['race_id'].to_numpy(),
+        'driver_id': race_results['driver_id'].to_numpy(),
+        'points': race_results['points'].to_numpy(dtype=np.float64),
+    })
+
+    df = df.sort_values(['year', 'driver_id', 'round', 'race_id'], kind='stable')
+    running = df.groupby(['year', 'driver_id'], sort=False)['points'].cumsum()
+    df['season_points'] = running.groupby([df['year'], df['driver_id'], df['race_id']], sort=False).transform('last')
+    return _by_id(df, ['result_id', 'year', 'race_id', 'driver_id', 'season_points'])
+
+
+_BUILDERS = {
+    'metric_qualifying': qualifying_metrics,
+    'metric_pit_stops': pit_stop_metrics,
+    'metric_driver_points': driver_points_metrics,
+}
+
+
+def build_window_metric(name, fact, dim_races):
+    """
+    Builds one table of WINDOW_METRICS from its in-memory fact frame.
+
+    Args:
+        name (str): Window metric table name.
+        fact (pd.DataFrame): Rows of the fact table it is computed from;
+            whole seasons, since some metrics run over a season.
+        dim_races (pd.DataFrame): The races dimension.
+
+    Returns:
+        pd.DataFrame: The window metric rows, sorted by fact id.
+    """
+    return _BUILDERS[name](fact, dim_races)
+
+
+def build_window_metric_from_processed(name, store, dim_races, years=None, chunksize=100_000):
+    """
+    Builds one table of WINDOW_METRICS from the processed fact table, chunk
+    by chunk. Only the columns it needs of the requested seasons are kept,
+    since the windows run over whole races and seasons.
+
+    Args:
+        name (str): Window metric table name.
+        store (ProcessedStore): Output holding the fact table.
+        dim_races (pd.DataFrame): The races dimension.
+        years (iterable, optional): Only these seasons; only their
+            partitions are read from Parquet output.
+        chunksize (int): Rows per chunk read back.
+
+    Returns:
+        pd.DataFrame: The window metric rows of those seasons.
+    """
+    if years is not None:
+        years = list(years)
+        dim_races = dim_races[dim_races['year'].isin(years)]
+    race_ids = dim_races['race_id'].to_numpy()
+    columns = WINDOW_INPUTS[name]
+    chunks = [
+        chunk[chunk['race_id'].isin(race_ids)]
+        for chunk in store.iter_chunks(WINDOW_METRICS[name], columns, years=years, chunksize=chunksize)
+    ]
+    fact = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    return build_window_metric(name, fact, dim_races)
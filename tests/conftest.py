@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline modules are flat scripts in src/qualify, imported by name.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src', 'qualify'))
@@ -0,0 +1,36 @@
+import os
+import time
+
+from metrics import WHOLE_RUN_PROFILE, RunMetrics
+from scheduler import StageScheduler
+
+
+def test_profiled_concurrent_stages(tmp_path):
+    profile_dir = tmp_path / 'profiles'
+    metrics = RunMetrics(profile_dir=str(profile_dir))
+    intervals = {}
+
+    def stage(name):
+        def run():
+            start = time.perf_counter()
+            time.sleep(0.2)
+            intervals[name] = (start, time.perf_counter())
+            return name
+        return run
+
+    scheduler = StageScheduler(max_workers=4, metrics=metrics)
+    scheduler.add('a', stage('a'), outputs=['a'])
+    scheduler.add('b', stage('b'), outputs=['b'])
+    values = scheduler.run()
+    metrics.close()
+
+    assert values == {'a': 'a', 'b': 'b'}
+    if WHOLE_RUN_PROFILE:
+        assert os.path.exists(profile_dir / 'run.prof')
+        assert {entry['profile'] for entry in metrics.stages.values()} == {str(profile_dir / 'run.prof')}
+    else:
+        for name in ('a', 'b'):
+            assert os.path.exists(metrics.stages[name]['profile'])
+        # Profiled stages run one at a time.
+        (first_start, first_end), (second_start, _) = sorted(intervals.values())
+        assert first_end <= second_start
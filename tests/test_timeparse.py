@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from timeparse import to_milliseconds
+
+PARSED = {
+    '1:23.456': 83456,
+    '1:26.427': 86427,
+    '1:02:03.5': 3723500,
+    '59.9999': 59999,
+    '+5.478': 5478,
+    '+ 9.9': 9900,
+    '+12.345s': 12345,
+    '+9.999 sec': 9999,
+    '+1:02.5': 62500,
+    '5 sec': 5000,
+}
+
+UNPARSEABLE = [
+    '+1 Lap',
+    '1e5',
+    '\\N',
+    '',
+    None,
+    '+  5',
+    '++5',
+    '5+',
+    '5 ',
+    '5se',
+    '5secs',
+    '5 s s',
+    # Empty fields around a separator.
+    '1:',
+    '5.',
+    '1:.5',
+    ':30.1',
+    '.5',
+    '1::02.5',
+    # Fields too wide for int64, or more of them than 'H:MM:SS'.
+    '99999999999999999999999',
+    '1234:00.0',
+    '1:2:3:4.5',
+]
+
+
+def test_parses_times_and_gaps():
+    result = to_milliseconds(pd.Series(list(PARSED)))
+    assert result.tolist() == list(PARSED.values())
+
+
+@pytest.mark.parametrize('value', UNPARSEABLE)
+def test_rejects_malformed_values(value):
+    assert to_milliseconds(pd.Series([value, '1:23.456'])).isna().tolist() == [True, False]
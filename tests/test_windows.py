@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+from aggregates import race_years
+from et import F1ETQualifyProcessor
+from output import ProcessedStore
+from windows import WINDOW_METRICS, build_window_metric, build_window_metric_from_processed
+
+RAW_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'raw')
+
+
+@pytest.fixture(scope='module')
+def processed(tmp_path_factory):
+    """Full-run fact frames next to a store holding the same facts written by a streaming run."""
+    processor = F1ETQualifyProcessor(data_path=RAW_DIRECTORY)
+    dims = {
+        name: getattr(processor, f"process_{name}")()
+        for name in ('dim_drivers', 'dim_constructors', 'dim_circuits', 'dim_races', 'dim_status')
+    }
+    dim_races = dims['dim_races']
+    facts = {name: getattr(processor, f"process_{name}")() for name in WINDOW_METRICS.values()}
+
+    store = ProcessedStore(str(tmp_path_factory.mktemp('processed')))
+    years = race_years(dim_races)
+    for name in WINDOW_METRICS.values():
+        for part, chunk in enumerate(getattr(processor, f"iter_{name}")(2_000)):
+            store.append(name, chunk, years, part)
+        store.finish_stream(name)
+    return dim_races, facts, store
+
+
+@pytest.mark.parametrize('name', list(WINDOW_METRICS))
+def test_streamed_metrics_match_full_run(processed, name):
+    dim_races, facts, store = processed
+    full = build_window_metric(name, facts[WINDOW_METRICS[name]], dim_races)
+    streamed = build_window_metric_from_processed(name, store, dim_races, chunksize=2_000)
+    # Processed frames carry compact dtypes; Parquet reads them back as int64.
+    pd.testing.assert_frame_equal(streamed, full, check_dtype=False)